@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Hash-rate benchmark for the mining hot path
+
+Builds a ROM (small by default), times each stage of a batch separately and runs
+the real mining loop across worker counts, hashing threads and pipeline modes.
+Results are written as JSON so runs can be compared across releases:
+
+    python bench.py --output before.json
+    python bench.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+import miner
+
+BENCH_ADDRESS = "addr1" + "0" * 53
+BENCH_CHALLENGE = {
+    "challenge_id": "**D00C00",
+    "difficulty": "00000000",  # never met, so the loop runs for the full duration
+    "no_pre_mine": "b" * 64,
+    "no_pre_mine_hour": "000000000",
+    "latest_submission": "2099-01-01T00:00:00.000Z",
+}
+
+
+def parse_list(value, cast=int):
+    return [cast(item) for item in value.split(',') if item]
+
+
+def time_components(rom, batch_size, rounds):
+    """Split one batch into nonce/preimage building, native hashing and the difficulty scan"""
+    nonces = miner.NonceAllocator(0)
+    preimage_static = BENCH_ADDRESS + "".join(BENCH_CHALLENGE[key] for key in (
+        "challenge_id", "difficulty", "no_pre_mine", "latest_submission", "no_pre_mine_hour"))
+    difficulty_value = int(BENCH_CHALLENGE["difficulty"][:8], 16)
+
+    prepare = hashing = scan = 0.0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        preimages = miner.build_preimages(preimage_static, nonces.allocate(batch_size), batch_size)
+        prepared = time.perf_counter()
+        hashes = rom.hash_batch(preimages)
+        hashed = time.perf_counter()
+        miner.find_solution(hashes, difficulty_value)
+        scanned = time.perf_counter()
+
+        prepare += prepared - start
+        hashing += hashed - prepared
+        scan += scanned - hashed
+
+    total_hashes = batch_size * rounds
+    total = prepare + hashing + scan
+    return {
+        "batch_size": batch_size,
+        "hashes": total_hashes,
+        "prepare_us_per_hash": prepare / total_hashes * 1e6,
+        "hash_us_per_hash": hashing / total_hashes * 1e6,
+        "scan_us_per_hash": scan / total_hashes * 1e6,
+        "native_fraction": hashing / total if total > 0 else 0,
+        "hash_rate": total_hashes / total if total > 0 else 0,
+    }
+
+
+def bench_worker(worker_id, status_board, rom, rom_params, duration, pipeline_mode, hash_threads, gil_released):
+    """Run the real mining loop for duration seconds and leave the result on the status board"""
+    if rom is None:
+        rom = miner.ashmaize_py.build_rom_twostep(**rom_params)
+    worker = miner.MinerWorker({'address': BENCH_ADDRESS, 'signature': '', 'pubkey': ''}, worker_id, status_board, None,
+                               donation_enabled=False, pipeline_mode=pipeline_mode, hash_threads=hash_threads)
+    # Reuse the parent's probe so it is not timed as part of the loop
+    worker.gil_released = gil_released
+    worker.mine_challenge_native(BENCH_CHALLENGE, rom, max_time=duration)
+
+
+def time_hot_loop(rom, rom_params, workers, threads, pipeline_mode, duration, gil_released):
+    """Aggregate hash rate of workers processes mining in parallel"""
+    status_board = miner.WorkerStatusBoard(workers)
+    # Forked workers share the ROM; elsewhere each builds its own before its timer starts
+    shared_rom = rom if miner.ROM_SHARING else None
+
+    start = time.time()
+    if workers == 1:
+        bench_worker(0, status_board, rom, rom_params, duration, pipeline_mode, threads, gil_released)
+    else:
+        processes = [miner.mp_context.Process(target=bench_worker, args=(worker_id, status_board, shared_rom, rom_params,
+                                                                         duration, pipeline_mode, threads, gil_released))
+                     for worker_id in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    elapsed = time.time() - start
+
+    statuses = [status_board.read(worker_id) or {} for worker_id in range(workers)]
+    return {
+        "workers": workers,
+        "threads": threads,
+        "pipeline": pipeline_mode,
+        "seconds": elapsed,
+        "hashes": sum(status.get('attempts', 0) for status in statuses),
+        "hash_rate": sum(status.get('hash_rate', 0) for status in statuses),
+        "final_batch_size": [status.get('batch_size', 0) for status in statuses],
+    }
+
+
+def case_key(case):
+    return f"workers={case['workers']} threads={case['threads']} pipeline={case['pipeline']}"
+
+
+def print_comparison(results, baseline_file):
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)
+
+    print()
+    print("="*70)
+    print(f"COMPARED WITH {baseline_file} (v{baseline.get('version', '?')}):")
+    before = {row['batch_size']: row for row in baseline.get('components', [])}
+    for row in results['components']:
+        old = before.get(row['batch_size'])
+        if old and old['hash_rate'] > 0:
+            print(f"  batch {row['batch_size']:<28} {old['hash_rate']:>10,.0f} -> {row['hash_rate']:>10,.0f} H/s "
+                  f"({row['hash_rate'] / old['hash_rate'] - 1:+.1%})")
+    before = {case_key(case): case for case in baseline.get('hot_loop', [])}
+    for case in results['hot_loop']:
+        old = before.get(case_key(case))
+        if old and old['hash_rate'] > 0:
+            print(f"  {case_key(case):<34} {old['hash_rate']:>10,.0f} -> {case['hash_rate']:>10,.0f} H/s "
+                  f"({case['hash_rate'] / old['hash_rate'] - 1:+.1%})")
+    print("="*70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the mining hot path')
+    parser.add_argument('--rom-size', type=float, default=64, help='ROM size in MiB (default: 64; the miner uses 1024)')
+    parser.add_argument('--full-rom', action='store_true', help='Use the miner\'s real ROM parameters')
+    parser.add_argument('--batch-sizes', default='100,1000,10000', help='Batch sizes for the stage timings (default: 100,1000,10000)')
+    parser.add_argument('--rounds', type=int, default=3, help='Batches timed per batch size (default: 3)')
+    parser.add_argument('--workers', default='1', help='Worker process counts for the mining loop (default: 1)')
+    parser.add_argument('--threads', default='1', help='Hashing threads per worker (default: 1)')
+    parser.add_argument('--pipeline', default='off,on', help='Pipeline modes (default: off,on)')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds per mining loop case (default: 5)')
+    parser.add_argument('--output', default='bench.json', help='JSON results file (default: bench.json)')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against')
+    args = parser.parse_args()
+
+    if args.full_rom:
+        rom_params = {'key': BENCH_CHALLENGE['no_pre_mine'], 'size': miner.ROM_SIZE,
+                      'pre_size': miner.ROM_PRE_SIZE, 'mixing_numbers': miner.ROM_MIXING_NUMBERS}
+    else:
+        size = int(args.rom_size * 1048576)
+        rom_params = {'key': BENCH_CHALLENGE['no_pre_mine'], 'size': size,
+                      'pre_size': min(miner.ROM_PRE_SIZE, size // 64), 'mixing_numbers': miner.ROM_MIXING_NUMBERS}
+
+    pipeline_modes = args.pipeline.split(',')
+    if any(mode not in ('auto', 'on', 'off') for mode in pipeline_modes):
+        print("Error: --pipeline modes must be auto, on or off")
+        return 1
+
+    print(f"Building {miner.format_gib(rom_params['size'])} ROM...", file=sys.stderr)
+    start = time.time()
+    rom = miner.ashmaize_py.build_rom_twostep(**rom_params)
+    rom_build_seconds = time.time() - start
+
+    results = {
+        "version": miner.VERSION,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": miner.HAS_NUMPY,
+        "gil_released": miner.native_releases_gil(rom),
+        "rom": {"size": rom_params['size'], "pre_size": rom_params['pre_size'],
+                "mixing_numbers": rom_params['mixing_numbers'], "build_seconds": rom_build_seconds},
+        "components": [],
+        "hot_loop": [],
+    }
+
+    for batch_size in parse_list(args.batch_sizes):
+        print(f"Timing batch stages at {batch_size}...", file=sys.stderr)
+        results['components'].append(time_components(rom, batch_size, args.rounds))
+
+    for workers in parse_list(args.workers):
+        for threads in parse_list(args.threads):
+            for pipeline_mode in pipeline_modes:
+                print(f"Mining loop: {workers} worker(s), {threads} thread(s), pipeline {pipeline_mode}...", file=sys.stderr)
+                results['hot_loop'].append(time_hot_loop(rom, rom_params, workers, threads, pipeline_mode,
+                                                               args.duration, results['gil_released']))
+
+    print("="*70, file=sys.stderr)
+    print(f"ROM build: {rom_build_seconds:.1f}s, GIL released: {results['gil_released']}, NumPy: {results['numpy']}", file=sys.stderr)
+    for row in results['components']:
+        print(f"  batch {row['batch_size']:<8} prepare {row['prepare_us_per_hash']:6.2f}us  hash {row['hash_us_per_hash']:8.2f}us  "
+              f"scan {row['scan_us_per_hash']:6.2f}us per hash  ({row['native_fraction']:.1%} native, {row['hash_rate']:,.0f} H/s)", file=sys.stderr)
+    for case in results['hot_loop']:
+        print(f"  {case_key(case):<34} {case['hash_rate']:>10,.0f} H/s", file=sys.stderr)
+    print("="*70, file=sys.stderr)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,19 @@ import os
 import sys
 import threading
 import logging
-from multiprocessing import Process, Queue, Manager
+import sqlite3
+import multiprocessing
+import multiprocessing.connection
+from multiprocessing import Manager
 from urllib.parse import quote
 from pycardano import PaymentSigningKey, PaymentVerificationKey, Address, Network
 import cbor2
 import random
+import math
+import heapq
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 # Import native Rust library
 try:
@@ -34,6 +42,65 @@ DEVELOPER_ADDRESS = random.choice(["addr1v8sd2hwjvumewp3t4rtqz5uwejjv504tus5w279
                                    "addr1v8mduamz9a7hghklsuug8szrhm4a0g5j8vxt7zsk2aetw9g8u2ak6","addr1v99tha5x72jdh58rxp3c8amarac6ahf693xwwx4q9hpnnsqcv4nrd"])
 DONATION_RATE = 0.05  # 5%
 
+DEFAULT_API_BASE = "https://scavenger.prod.gd.midnighttge.io/"
+
+# ROM parameters (TwoStep, matches WASM parameters)
+ROM_SIZE = 1073741824
+ROM_PRE_SIZE = 16777216
+ROM_MIXING_NUMBERS = 4
+
+# Nonce layout: worker id in the top bits, per-worker counter in the rest
+NONCE_WORKER_BITS = 16
+NONCE_COUNTER_BITS = 64 - NONCE_WORKER_BITS
+
+# Adaptive batch sizing: each rom.hash_batch call should take about this long
+BATCH_TARGET_SECONDS = 1.0
+BATCH_SIZE_INITIAL = 1000
+BATCH_SIZE_MIN = 100
+BATCH_SIZE_MAX = 100000
+
+# Scheduling: stop this long before a deadline, and give up after this many expected solve times
+SUBMIT_MARGIN_SECONDS = 60
+MINE_TIME_MIN = 3600
+MINE_EXPECTED_MULTIPLE = 3
+
+# Solution submission retries: delay doubles from the base up to the cap
+SUBMIT_ATTEMPTS = 5
+SUBMIT_BACKOFF_BASE = 5
+SUBMIT_BACKOFF_MAX = 300
+
+# Solution journal: buffered records are fsynced together at most this often
+JOURNAL_COMMIT_INTERVAL = 1.0
+JOURNAL_STATUSES = ('found', 'accepted', 'rejected', 'saved')
+
+# Wallet statistics: concurrent requests and how long a fetched result is reused
+STATS_FETCH_WORKERS = 16
+STATS_CACHE_TTL = 3600
+
+# Wallet provisioning: signing moves to a process pool from this many new wallets
+WALLET_POOL_MIN = 16
+WALLET_REGISTER_WORKERS = 8
+
+TERMS_MESSAGE_FALLBACK = "I agree to abide by the terms and conditions as described in version 1-0 of the Midnight scavenger mining process: 281ba5f69f4b943e3fb8a20390878a232787a04e4be22177f2472b63df01c200"
+
+# Challenge watcher: how often the parent polls /challenge, and the (connect, read) timeout
+CHALLENGE_POLL_INTERVAL = 30
+CHALLENGE_FETCH_TIMEOUT = (5, 15)
+
+# Challenges less likely than this to be solved before their deadline are skipped
+HOPELESS_PROBABILITY = 0.05
+
+# Number of ROMs built at startup for challenges already in challenges.json
+ROM_WARM_LIMIT = 2
+
+# Default memory budget for each ROM cache (parent and per worker), overridable with --rom-budget
+ROM_CACHE_BUDGET = 2 * ROM_SIZE
+
+# On Linux, workers are forked from the parent so ROMs built there are shared copy-on-write
+# (the parent is multithreaded by then; ForkGuard keeps its SQLite calls out of the way of forks)
+ROM_SHARING = sys.platform.startswith('linux')
+mp_context = multiprocessing.get_context('fork') if ROM_SHARING else multiprocessing
+
 # Cross-platform file locking
 try:
     import portalocker
@@ -45,6 +112,13 @@ except ImportError:
     else:
         import fcntl
 
+# Optional NumPy for vectorized difficulty checks over a whole batch
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 
 def lock_file(file_handle):
     """Acquire exclusive lock on file (cross-platform)"""
@@ -89,6 +163,707 @@ def append_solution_to_csv(address, challenge_id, nonce):
         return False
 
 
+def build_rom(no_pre_mine):
+    """Build the ROM for a challenge key"""
+    # Use TwoStep for speed (matches WASM parameters)
+    return ashmaize_py.build_rom_twostep(
+        key=no_pre_mine,
+        size=ROM_SIZE,
+        pre_size=ROM_PRE_SIZE,
+        mixing_numbers=ROM_MIXING_NUMBERS
+    )
+
+
+def format_gib(num_bytes):
+    """Format a byte count in GiB for display"""
+    return f"{num_bytes / 1073741824:.1f} GiB"
+
+
+# Worker states reported through WorkerStatusBoard; any other status text means mining that challenge
+WORKER_STATES = ['Starting', 'Initializing...', 'Ready', 'Mining', 'Building ROM', 'Waiting for shared ROM',
+                 'Switching to shared ROM', 'Solution queued', 'No solution found', 'Expired', 'All completed',
+                 'Waiting for wallet', 'Preempted', 'Error']
+
+
+class WorkerStatusBoard:
+    """Fixed-layout shared-memory status block with one slot per worker.
+
+    Each worker is the only writer of its slot and brackets every write with a
+    sequence counter (odd while writing), so updates need no lock and no
+    Manager round trip; the dashboard simply retries a read that overlapped a write.
+    """
+
+    NUMERIC_FIELDS = ('seq', 'state', 'attempts', 'hash_rate', 'last_update', 'batch_size', 'batch_seconds',
+                      'local_roms', 'rom_hits', 'rom_misses', 'rom_evictions', 'eta_seconds', 'p_solve')
+    TEXT_FIELDS = (('address', 104), ('current_challenge', 64))
+
+    def __init__(self, num_workers):
+        self.num_workers = num_workers
+        self.numeric_index = {name: i for i, name in enumerate(self.NUMERIC_FIELDS)}
+        self.text_offsets = {}
+        offset = 0
+        for name, width in self.TEXT_FIELDS:
+            self.text_offsets[name] = (offset, width)
+            offset += width
+        self.text_slot = offset
+        self.numbers = mp_context.RawArray('d', num_workers * len(self.NUMERIC_FIELDS))
+        self.text = mp_context.RawArray('c', num_workers * self.text_slot)
+
+    def update(self, worker_id, **fields):
+        """Write fields into the worker's slot"""
+        base = worker_id * len(self.NUMERIC_FIELDS)
+        text_base = worker_id * self.text_slot
+        seq = self.numbers[base]
+        self.numbers[base] = seq + 1
+
+        if 'rom_cache' in fields:
+            for counter, value in fields.pop('rom_cache').items():
+                fields[f'rom_{counter}'] = value
+        if 'current_challenge' in fields:
+            text = str(fields['current_challenge'])
+            if text in WORKER_STATES:
+                fields['state'] = WORKER_STATES.index(text)
+            elif text.startswith('Error'):
+                fields['state'] = WORKER_STATES.index('Error')
+            else:
+                fields['state'] = WORKER_STATES.index('Mining')
+        fields['last_update'] = time.time()
+
+        for name, value in fields.items():
+            if name in self.text_offsets:
+                offset, width = self.text_offsets[name]
+                encoded = str(value).encode('utf-8')[:width].ljust(width, b'\0')
+                self.text[text_base + offset:text_base + offset + width] = encoded
+            else:
+                self.numbers[base + self.numeric_index[name]] = value or 0
+
+        self.numbers[base] = seq + 2
+
+    def read(self, worker_id):
+        """Return the worker's status as a dict, or None if it has never reported"""
+        base = worker_id * len(self.NUMERIC_FIELDS)
+        text_base = worker_id * self.text_slot
+        for _ in range(100):
+            seq = self.numbers[base]
+            numbers = self.numbers[base:base + len(self.NUMERIC_FIELDS)]
+            text = self.text[text_base:text_base + self.text_slot]
+            if seq % 2 == 0 and self.numbers[base] == seq:
+                break
+            time.sleep(0)
+
+        if numbers[self.numeric_index['last_update']] == 0:
+            return None
+
+        status = dict(zip(self.NUMERIC_FIELDS[1:], numbers[1:]))
+        for name in ('state', 'attempts', 'batch_size', 'local_roms', 'rom_hits', 'rom_misses', 'rom_evictions'):
+            status[name] = int(status[name])
+        status['state_name'] = WORKER_STATES[status['state']]
+        for name, (offset, width) in self.text_offsets.items():
+            status[name] = text[offset:offset + width].rstrip(b'\0').decode('utf-8', errors='ignore')
+        return status
+
+
+class RomCache:
+    """LRU cache of ROMs keyed by no_pre_mine, bounded by a memory budget.
+
+    ROMs are evicted least-recently-used first when the budget is exceeded, and
+    explicitly through prune() once no unexpired, unsolved challenge needs them.
+    """
+
+    def __init__(self, max_bytes=ROM_CACHE_BUDGET, roms=None):
+        self.max_bytes = max_bytes
+        self.roms = OrderedDict(roms or {})
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, no_pre_mine):
+        return no_pre_mine in self.roms
+
+    def __len__(self):
+        return len(self.roms)
+
+    def keys(self):
+        return self.roms.keys()
+
+    def get(self, no_pre_mine):
+        rom = self.roms.get(no_pre_mine)
+        if rom is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.roms.move_to_end(no_pre_mine)
+        return rom
+
+    def put(self, no_pre_mine, rom):
+        self.roms[no_pre_mine] = rom
+        self.roms.move_to_end(no_pre_mine)
+        # Always keep the ROM just added, even if the budget is smaller than one ROM
+        while len(self.roms) > 1 and self.memory_usage() > self.max_bytes:
+            self.roms.popitem(last=False)
+            self.evictions += 1
+
+    def prune(self, needed_keys):
+        """Drop ROMs whose keys are not in needed_keys (those of unexpired challenges). Returns evicted keys."""
+        evicted = [key for key in self.roms if key not in needed_keys]
+        for key in evicted:
+            del self.roms[key]
+        self.evictions += len(evicted)
+        return evicted
+
+    def memory_usage(self):
+        return len(self.roms) * ROM_SIZE
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+class RomCoordinator:
+    """Builds each ROM once in the parent process and hands it to forked workers.
+
+    Workers inherit the parent's ROMs through fork(), so every worker reads the
+    same physical pages (copy-on-write, never written) instead of building its
+    own 1 GiB copy. On platforms without fork the coordinator stays empty and
+    workers fall back to building their own ROMs.
+    """
+
+    def __init__(self, enabled=ROM_SHARING, rom_status=None, max_bytes=ROM_CACHE_BUDGET):
+        self.enabled = enabled
+        self.roms = RomCache(max_bytes)
+        # no_pre_mine -> 'building' | 'ready', visible to workers through a Manager dict
+        self.rom_status = rom_status if rom_status is not None else {}
+        self._building = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger('midnight_miner')
+
+    def ensure(self, no_pre_mine):
+        """Build the ROM for no_pre_mine if it is not already shared.
+
+        Builds run outside the lock so the dashboard and spawn loop keep going;
+        concurrent callers for the same key wait for the one build.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            rom = self.roms.get(no_pre_mine)
+            if rom is not None:
+                return rom
+            done = self._building.get(no_pre_mine)
+            if done is None:
+                done = self._building[no_pre_mine] = threading.Event()
+                self.rom_status[no_pre_mine] = 'building'
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            done.wait()
+            with self._lock:
+                return self.roms.roms.get(no_pre_mine)
+
+        try:
+            self.logger.info(f"ROM coordinator: building shared ROM for key {no_pre_mine[:16]}...")
+            start = time.time()
+            rom = build_rom(no_pre_mine)
+            with self._lock:
+                before = set(self.roms.keys())
+                self.roms.put(no_pre_mine, rom)
+                self._unpublish(before - set(self.roms.keys()))
+            self.rom_status[no_pre_mine] = 'ready'
+            self.logger.info(f"ROM coordinator: shared ROM ready in {time.time() - start:.1f}s ({len(self.roms)} cached)")
+            return rom
+        except Exception:
+            self.rom_status.pop(no_pre_mine, None)
+            raise
+        finally:
+            with self._lock:
+                self._building.pop(no_pre_mine).set()
+
+    def _unpublish(self, keys):
+        for key in keys:
+            self.rom_status.pop(key, None)
+            self.logger.info(f"ROM coordinator: evicted ROM for key {key[:16]}...")
+
+    def prune(self, needed_keys):
+        """Evict ROMs whose challenges have all expired.
+
+        A challenge every current wallet has solved is kept: the next new wallet
+        needs it again. Workers already forked keep their own reference until they exit.
+        """
+        with self._lock:
+            self._unpublish(self.roms.prune(needed_keys))
+
+    def warm(self, challenge_tracker, wallet_addresses=None, limit=ROM_WARM_LIMIT, hash_rate=None):
+        """Build ROMs for the challenges workers will mine first, before any worker starts"""
+        if not self.enabled:
+            return 0
+        keys = challenge_tracker.get_active_rom_keys(wallet_addresses, hash_rate)[:limit]
+        for no_pre_mine in keys:
+            self.ensure(no_pre_mine)
+        return len(keys)
+
+    def snapshot(self):
+        """ROMs to hand to a newly forked worker"""
+        with self._lock:
+            return dict(self.roms.roms)
+
+    def memory_usage(self):
+        """Bytes of ROM held by the parent and shared with workers"""
+        with self._lock:
+            return self.roms.memory_usage()
+
+    def stats(self):
+        with self._lock:
+            return self.roms.stats()
+
+
+class ChallengeWatcher:
+    """Polls /challenge from the main process and registers new challenges
+
+    Workers read challenges from the shared database, so API load does not grow
+    with the worker count. Polls reuse one keep-alive session and send the
+    previous ETag / Last-Modified so an unchanged challenge costs a 304.
+    """
+
+    def __init__(self, api_base, challenge_tracker, interval=CHALLENGE_POLL_INTERVAL, on_new_challenge=None):
+        self.api_base = api_base.rstrip('/')
+        self.challenge_tracker = challenge_tracker
+        self.interval = interval
+        self.on_new_challenge = on_new_challenge
+        self.session = requests.Session()
+        self.logger = logging.getLogger('midnight_miner')
+        self._validators = {}
+        self._stop = threading.Event()
+
+    def poll(self):
+        """Fetch the current challenge once; returns it if it was new to the tracker"""
+        try:
+            response = self.session.get(f"{self.api_base}/challenge", headers=self._validators,
+                                        timeout=CHALLENGE_FETCH_TIMEOUT)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            self.logger.warning(f"Challenge watcher: failed to fetch challenge - {e}")
+            return None
+
+        self._validators = {}
+        if response.headers.get('ETag'):
+            self._validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            self._validators['If-Modified-Since'] = response.headers['Last-Modified']
+
+        if data.get("code") != "active":
+            return None
+        challenge = data["challenge"]
+        if not self.challenge_tracker.register_challenge(challenge):
+            return None
+
+        self.logger.info(f"Discovered new challenge {challenge['challenge_id']} (difficulty {challenge['difficulty'][:8]})")
+        if self.on_new_challenge:
+            self.on_new_challenge(challenge)
+        return challenge
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+
+class SolutionJournal:
+    """Append-only JSON-lines log of every solution and what happened to it
+
+    Records are buffered and committed in groups with one write and one fsync.
+    After each commit a small index file stores the journal length and per-status
+    counts, so readers get totals without scanning the journal; on open only the
+    part written after the last index update is rescanned.
+    """
+
+    def __init__(self, journal_file="solutions.jsonl", index_file=None):
+        self.journal_file = journal_file
+        self.index_file = index_file or journal_file + ".idx"
+        self.logger = logging.getLogger('midnight_miner')
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()  # one writer at a time keeps offset and index in step
+        self._buffer = []
+        self._last_commit = 0
+        self.offset = 0
+        self.counts = dict.fromkeys(JOURNAL_STATUSES, 0)
+        self._load_index()
+
+    def _load_index(self):
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r') as f:
+                    index = json.load(f)
+                self.offset = index['offset']
+                self.counts.update(index['counts'])
+            except (OSError, ValueError, KeyError):
+                self.offset = 0
+                self.counts = dict.fromkeys(JOURNAL_STATUSES, 0)
+
+        size = os.path.getsize(self.journal_file) if os.path.exists(self.journal_file) else 0
+        if size < self.offset:
+            # Journal was replaced or truncated, so the index no longer describes it
+            self.offset = 0
+            self.counts = dict.fromkeys(JOURNAL_STATUSES, 0)
+        if size > self.offset:
+            # Records committed after the last index update (e.g. a crash in between)
+            with open(self.journal_file, 'rb') as f:
+                f.seek(self.offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        status = json.loads(line)['status']
+                    except (ValueError, KeyError):
+                        status = None
+                    if status in self.counts:
+                        self.counts[status] += 1
+                    self.offset += len(line)
+            self._write_index()
+
+    def _write_index(self, counts=None):
+        temp_file = self.index_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump({'offset': self.offset, 'counts': counts or self.counts}, f)
+        os.replace(temp_file, self.index_file)
+
+    def record(self, status, solution, **extra):
+        entry = {'time': datetime.now(timezone.utc).isoformat(), 'status': status,
+                 'address': solution['address'], 'wallet': solution['wallet'],
+                 'challenge_id': solution['challenge_id'], 'nonce': solution['nonce']}
+        entry.update(extra)
+        with self._lock:
+            self._buffer.append(json.dumps(entry) + "\n")
+            self.counts[status] += 1
+
+    def commit(self, force=False):
+        """Write and fsync buffered records, at most once per JOURNAL_COMMIT_INTERVAL unless forced"""
+        with self._commit_lock:
+            with self._lock:
+                if not self._buffer or (not force and time.time() - self._last_commit < JOURNAL_COMMIT_INTERVAL):
+                    return
+                data = "".join(self._buffer).encode('utf-8')
+                self._buffer = []
+                counts = dict(self.counts)
+            try:
+                with open(self.journal_file, 'ab') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.offset += len(data)
+                # Counts as of this commit; if the index lags the journal, opening it catches up
+                self._write_index(counts)
+            except OSError as e:
+                self.logger.error(f"Failed to write solution journal: {e}")
+            self._last_commit = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class SolutionSubmitter:
+    """Submits solutions found by workers from a background thread in the main process
+
+    Workers put solutions on the queue and move straight on to the next challenge.
+    Network errors are retried with exponential backoff over one keep-alive session;
+    solutions that are rejected or run out of attempts are saved to solutions.csv.
+    Every outcome is recorded in the solution journal, and a challenge is only
+    marked solved once its solution has been journaled here.
+    """
+
+    def __init__(self, api_base, solution_queue=None, journal=None, challenge_tracker=None):
+        self.api_base = api_base.rstrip('/')
+        self.queue = solution_queue if solution_queue is not None else mp_context.Queue()
+        self.journal = journal if journal is not None else SolutionJournal()
+        self.challenge_tracker = challenge_tracker
+        self.session = requests.Session()
+        self.logger = logging.getLogger('midnight_miner')
+        self._ready = queue.Queue()  # journaled solutions waiting for their first attempt
+        self._retries = []  # heap of (due time, sequence, solution)
+        self._sequence = 0
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        # Intake journals and marks solutions as they arrive, so a slow API never holds up workers
+        self._threads = [threading.Thread(target=self._intake, daemon=True),
+                         threading.Thread(target=self._run, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop both threads, then save anything still unsubmitted to solutions.csv.
+
+        Waits for a submission in progress to finish (bounded by its request timeout)
+        so nothing is saved here while a thread may still post or journal it.
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1)
+            if thread.is_alive():
+                self.logger.info("Solution submitter: waiting for a submission in progress...")
+                thread.join()
+        drained = self._drain()
+        self._found(drained)
+        unsent = drained + [solution for _, _, solution in self._retries]
+        while True:
+            try:
+                unsent.append(self._ready.get_nowait())
+            except queue.Empty:
+                break
+        for solution in unsent:
+            self._save(solution, "shutdown")
+        self._retries = []
+        self.journal.commit(force=True)
+
+    def pending(self):
+        return len(self._retries)
+
+    def _intake(self):
+        while not self._stop.is_set():
+            try:
+                solutions = [self.queue.get(timeout=1.0)] + self._drain()
+                self._found(solutions)
+                for solution in solutions:
+                    self._ready.put(solution)
+            except queue.Empty:
+                pass
+            except Exception as e:
+                self.logger.error(f"Solution submitter error: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            timeout = 1.0
+            if self._retries:
+                timeout = min(timeout, max(0, self._retries[0][0] - time.time()))
+            try:
+                self._attempt(self._ready.get(timeout=timeout))
+            except queue.Empty:
+                pass
+            except Exception as e:
+                self.logger.error(f"Solution submitter error: {e}")
+
+            while self._retries and self._retries[0][0] <= time.time() and not self._stop.is_set():
+                _, _, solution = heapq.heappop(self._retries)
+                self._attempt(solution)
+
+            # Group commit: one fsync covers everything recorded since the last one
+            self.journal.commit()
+
+    def _drain(self):
+        solutions = []
+        while True:
+            try:
+                solutions.append(self.queue.get_nowait())
+            except queue.Empty:
+                return solutions
+
+    def _found(self, solutions):
+        """Journal solutions fresh off the queue; once that is on disk their challenges are done for the wallet"""
+        if not solutions:
+            return
+        for solution in solutions:
+            self.journal.record('found', solution)
+        self.journal.commit(force=True)
+        if self.challenge_tracker is not None:
+            for solution in solutions:
+                self.challenge_tracker.mark_solved(solution['challenge_id'], solution['wallet'])
+
+    def _attempt(self, solution):
+        solution['attempts'] = solution.get('attempts', 0) + 1
+        if self.submit(solution) is not None:
+            return
+
+        if solution['attempts'] >= SUBMIT_ATTEMPTS or seconds_until(solution['latest_submission']) <= 0:
+            self._save(solution, f"no response after {solution['attempts']} attempts")
+            return
+        delay = min(SUBMIT_BACKOFF_BASE * 2 ** (solution['attempts'] - 1), SUBMIT_BACKOFF_MAX)
+        self.logger.info(f"Worker {solution['worker_id']}: Retrying submission for challenge {solution['challenge_id']} in {delay}s "
+                         f"(attempt {solution['attempts'] + 1}/{SUBMIT_ATTEMPTS})")
+        self._sequence += 1
+        heapq.heappush(self._retries, (time.time() + delay, self._sequence, solution))
+
+    def submit(self, solution):
+        """Post one solution; True if accepted, False if rejected, None on a network error"""
+        prefix = f"Worker {solution['worker_id']} ({solution['wallet'][:20]}...)"
+        url = f"{self.api_base}/solution/{solution['address']}/{solution['challenge_id']}/{solution['nonce']}"
+
+        try:
+            response = self.session.post(url, json={}, timeout=15)
+            response.raise_for_status()
+            data = response.json()
+            success = data.get("crypto_receipt") is not None
+            if success:
+                self.journal.record('accepted', solution)
+                self.logger.info(f"{prefix}: Solution ACCEPTED for challenge {solution['challenge_id']}")
+            else:
+                self.journal.record('rejected', solution, reason="No receipt")
+                self.logger.warning(f"{prefix}: Solution REJECTED for challenge {solution['challenge_id']} - No receipt")
+            return success
+        except requests.exceptions.HTTPError as e:
+            error_detail = e.response.text
+            if e.response.status_code >= 500:
+                # Server-side trouble is not a verdict on the solution - retry like a network error
+                self.logger.warning(f"{prefix}: Solution submission error for challenge {solution['challenge_id']} - {e.response.status_code}: {error_detail[:200]}")
+                return None
+            self.journal.record('rejected', solution, reason=f"{e.response.status_code}: {error_detail[:200]}")
+            self.logger.warning(f"{prefix}: Solution REJECTED for challenge {solution['challenge_id']} - {e.response.status_code}: {error_detail}")
+
+            # Save to CSV since this is a definitive rejection (not a network error)
+            if not ("Solution already exists" in error_detail):
+                self._save(solution)
+            return False
+        except Exception as e:
+            self.logger.warning(f"{prefix}: Solution submission error for challenge {solution['challenge_id']} - {e}")
+            return None
+
+    def _save(self, solution, reason=None):
+        if reason:
+            self.logger.warning(f"Worker {solution['worker_id']}: Saving solution for challenge {solution['challenge_id']} to solutions.csv ({reason})")
+        if append_solution_to_csv(solution['address'], solution['challenge_id'], solution['nonce']):
+            self.journal.record('saved', solution, reason=reason or "rejected")
+        else:
+            self.logger.error(f"Worker {solution['worker_id']}: Failed to write solution to file")
+
+
+class NonceAllocator:
+    """Hands out disjoint ranges of the 64-bit nonce space.
+
+    The top NONCE_WORKER_BITS bits hold the worker id and the rest is a counter
+    starting at a random per-run salt, so workers never overlap and a worker
+    never repeats a nonce within a run. Safe to share between threads.
+    """
+
+    def __init__(self, worker_id, salt=None):
+        self.prefix = (worker_id % (1 << NONCE_WORKER_BITS)) << NONCE_COUNTER_BITS
+        self.counter = secrets.randbits(NONCE_COUNTER_BITS) if salt is None else salt % (1 << NONCE_COUNTER_BITS)
+        self._lock = threading.Lock()
+
+    def allocate(self, count):
+        """Reserve count consecutive nonces; returns the first one as an integer"""
+        with self._lock:
+            start = self.counter
+            if start + count > (1 << NONCE_COUNTER_BITS):
+                start = 0
+            self.counter = start + count
+        return self.prefix | start
+
+
+class BatchSizer:
+    """Tunes the rom.hash_batch batch size from measured latency.
+
+    Large batches amortise Python overhead, small ones keep status updates and
+    deadline checks responsive; aim for target_seconds per native call.
+    """
+
+    def __init__(self, target_seconds=BATCH_TARGET_SECONDS, initial=BATCH_SIZE_INITIAL,
+                 min_size=BATCH_SIZE_MIN, max_size=BATCH_SIZE_MAX):
+        self.target_seconds = target_seconds
+        self.size = initial
+        self.min_size = min_size
+        self.max_size = max_size
+        self.seconds_per_hash = None
+        self.last_batch_seconds = 0.0
+
+    def record(self, batch_size, elapsed):
+        """Feed back how long a batch of batch_size hashes took"""
+        self.last_batch_seconds = elapsed
+        if batch_size <= 0 or elapsed <= 0:
+            return
+        sample = elapsed / batch_size
+        if self.seconds_per_hash is None:
+            self.seconds_per_hash = sample
+        else:
+            self.seconds_per_hash = 0.7 * self.seconds_per_hash + 0.3 * sample
+
+        # Move towards the ideal size, at most doubling or halving per batch
+        ideal = self.target_seconds / self.seconds_per_hash
+        ideal = max(self.size / 2, min(self.size * 2, ideal))
+        self.size = int(max(self.min_size, min(self.max_size, ideal)))
+
+    def size_for(self, seconds_left):
+        """Batch size to use, shrunk so the batch does not run past seconds_left"""
+        if self.seconds_per_hash is None:
+            return self.size
+        fit = int(seconds_left / self.seconds_per_hash)
+        return max(self.min_size, min(self.size, fit))
+
+
+def native_releases_gil(rom, probe_seconds=0.2):
+    """Check whether rom.hash_batch lets other Python threads run while it hashes.
+
+    A spinning thread counts ticks during a short native call and during an
+    equally long sleep. If the GIL is held it only runs until the call starts
+    (about one switch interval); if released it keeps at least half its speed
+    even when competing for a single core.
+    """
+    ticks = 0
+    stop = threading.Event()
+
+    def spin():
+        nonlocal ticks
+        while not stop.is_set():
+            ticks += 1
+
+    spinner = threading.Thread(target=spin, daemon=True)
+    spinner.start()
+    try:
+        # Grow the probe batch until one call lasts long enough to measure
+        size = 8
+        while True:
+            before = ticks
+            start = time.time()
+            rom.hash_batch(["0" * 16] * size)
+            elapsed = time.time() - start
+            during_call = ticks - before
+            if elapsed >= probe_seconds or size >= 65536:
+                break
+            size *= 2
+
+        before = ticks
+        time.sleep(elapsed)
+        during_sleep = ticks - before
+    finally:
+        stop.set()
+        spinner.join()
+
+    return during_sleep > 0 and during_call > 0.25 * during_sleep
+
+
+def build_preimages(preimage_static, first_nonce, count):
+    """Build preimages for count consecutive nonces; each preimage's nonce is its first 16 chars"""
+    if HAS_NUMPY:
+        nonce_hex = np.arange(first_nonce, first_nonce + count, dtype='>u8').tobytes().hex()
+        return [nonce_hex[i:i + 16] + preimage_static for i in range(0, 16 * count, 16)]
+    return [f"{nonce:016x}{preimage_static}" for nonce in range(first_nonce, first_nonce + count)]
+
+
+def find_solution(hashes, difficulty_value):
+    """Return the index of the first hash meeting the difficulty, or -1.
+
+    A hash passes when its first 32 bits have no bits set outside the difficulty mask.
+    """
+    reject_bits = ~difficulty_value & 0xFFFFFFFF
+    if HAS_NUMPY:
+        prefixes = np.frombuffer(bytes.fromhex(''.join([h[:8] for h in hashes])), dtype='>u4')
+        matches = np.flatnonzero((prefixes & reject_bits) == 0)
+        return int(matches[0]) if len(matches) else -1
+
+    for i, hash_hex in enumerate(hashes):
+        if not int(hash_hex[:8], 16) & reject_bits:
+            return i
+    return -1
+
+
 def setup_logging():
     """Setup file and console logging"""
     log_format = '%(asctime)s - %(levelname)s - [%(processName)s] - %(message)s'
@@ -114,102 +889,463 @@ def setup_logging():
     return logger
 
 
-class ChallengeTracker:
-    """Manages challenge tracking and completion status with cross-process file locking"""
+def difficulty_zero_bits(difficulty):
+    """Zero bits in the first 32 bits of the difficulty mask; a hash must be zero in each of them"""
+    return 32 - bin(int(difficulty[:8], 16)).count('1')
 
-    def __init__(self, challenges_file="challenges.json"):
-        self.challenges_file = challenges_file
-        if not os.path.exists(self.challenges_file):
-            with open(self.challenges_file, 'w') as f:
-                json.dump({}, f)
 
-    def _locked_operation(self, modify_func):
-        with open(self.challenges_file, 'r+') as f:
-            lock_file(f)
-            try:
-                f.seek(0)
-                content = f.read()
-                challenges = json.loads(content) if content else {}
+def expected_hashes(difficulty):
+    """Expected number of hashes to find one solution"""
+    return 2 ** difficulty_zero_bits(difficulty)
 
-                modified_challenges, result = modify_func(challenges)
 
-                f.seek(0)
-                f.truncate()
-                json.dump(modified_challenges, f, indent=2)
-                f.flush()
-                os.fsync(f.fileno())
+def expected_solve_seconds(difficulty, hash_rate):
+    """Expected seconds to solve at hash_rate H/s, or None if the rate is unknown"""
+    if not hash_rate:
+        return None
+    return expected_hashes(difficulty) / hash_rate
 
-                return result
-            finally:
-                unlock_file(f)
 
-    def register_challenge(self, challenge):
-        def modify(challenges):
-            challenge_id = challenge['challenge_id']
-            if challenge_id not in challenges:
-                challenges[challenge_id] = {
-                    'challenge_id': challenge['challenge_id'],
-                    'day': challenge.get('day'),
-                    'challenge_number': challenge.get('challenge_number'),
-                    'difficulty': challenge['difficulty'],
-                    'no_pre_mine': challenge['no_pre_mine'],
-                    'no_pre_mine_hour': challenge['no_pre_mine_hour'],
-                    'latest_submission': challenge['latest_submission'],
-                    'discovered_at': datetime.now(timezone.utc).isoformat(),
-                    'solved_by': []
-                }
-                return (challenges, True)
-            return (challenges, False)
-
-        return self._locked_operation(modify)
-
-    def mark_solved(self, challenge_id, wallet_address):
-        def modify(challenges):
-            if challenge_id in challenges:
-                if wallet_address not in challenges[challenge_id]['solved_by']:
-                    challenges[challenge_id]['solved_by'].append(wallet_address)
-                    return (challenges, True)
-            return (challenges, False)
-
-        return self._locked_operation(modify)
+def solve_probability(difficulty, hash_rate, seconds):
+    """Probability of at least one solution within seconds at hash_rate H/s, or None if the rate is unknown"""
+    if not hash_rate:
+        return None
+    if seconds <= 0:
+        return 0.0
+    return 1 - math.exp(-hash_rate * seconds / expected_hashes(difficulty))
+
+
+def format_duration(seconds):
+    """Short human-readable duration for the dashboard"""
+    if seconds is None:
+        return "N/A"
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+def is_hopeless(challenge, hash_rate):
+    """Whether the challenge is very unlikely to be solved before its deadline"""
+    time_left = seconds_until(challenge['latest_submission']) - SUBMIT_MARGIN_SECONDS
+    probability = solve_probability(challenge['difficulty'], hash_rate, time_left)
+    return probability is not None and probability < HOPELESS_PROBABILITY
+
+
+def seconds_until(latest_submission):
+    deadline = datetime.fromisoformat(latest_submission.replace('Z', '+00:00'))
+    return (deadline - datetime.now(timezone.utc)).total_seconds()
+
+
+def order_challenges(challenges, hash_rate):
+    """Order challenges to maximise expected solves: earliest deadline first among those
+    expected to finish in time, then the ones unlikely to finish (most time left first)"""
+    feasible, unlikely = [], []
+    for challenge in challenges:
+        time_left = seconds_until(challenge['latest_submission']) - SUBMIT_MARGIN_SECONDS
+        expected = expected_solve_seconds(challenge['difficulty'], hash_rate)
+        if expected is None or expected <= time_left:
+            feasible.append((time_left, challenge))
+        else:
+            unlikely.append((time_left, challenge))
+    feasible.sort(key=lambda c: c[0])
+    unlikely.sort(key=lambda c: c[0], reverse=True)
+    return [challenge for time_left, challenge in feasible + unlikely]
+
+
+def mining_time_limit(challenge, time_left, hash_rate):
+    """How long to mine a challenge before giving up on it.
+
+    Mine until just before the deadline, but stop after MINE_EXPECTED_MULTIPLE expected
+    solve times (~95% of solves) so one unlucky challenge cannot hold the worker forever.
+    Until a hash rate is known, stop after MINE_TIME_MIN.
+    """
+    limit = time_left - SUBMIT_MARGIN_SECONDS
+    expected = expected_solve_seconds(challenge['difficulty'], hash_rate)
+    if expected is not None:
+        limit = min(limit, max(MINE_TIME_MIN, MINE_EXPECTED_MULTIPLE * expected))
+    else:
+        limit = min(limit, MINE_TIME_MIN)
+    return max(0, limit)
 
-    def get_unsolved_challenge(self, wallet_address):
-        def find_challenge(challenges):
-            now = datetime.now(timezone.utc)
-            candidates = []
 
+class ChallengeScheduler:
+    """Decides which (wallet, challenge) work unit each idle worker gets.
+
+    Uses the measured per-worker hash rate and each challenge's difficulty to
+    estimate solve times, serves the most urgent solvable work first and logs
+    every decision.
+    """
+
+    def __init__(self, challenge_tracker):
+        self.challenge_tracker = challenge_tracker
+        self.hash_rate = None
+        self.logger = logging.getLogger('midnight_miner')
+
+    def update_hash_rate(self, status_board):
+        """Average hash rate of the workers currently hashing"""
+        rates = []
+        for worker_id in range(status_board.num_workers):
+            status = status_board.read(worker_id)
+            if status and status['hash_rate'] > 0:
+                rates.append(status['hash_rate'])
+        if rates:
+            self.hash_rate = sum(rates) / len(rates)
+
+    def plan(self, wallet_addresses):
+        """Return work units (address, challenge) for the given free wallets, best first"""
+        units = []
+        for address, unsolved in self.challenge_tracker.get_wallets_with_unsolved(wallet_addresses):
+            challenge = order_challenges(unsolved, self.hash_rate)[0]
+            time_left = seconds_until(challenge['latest_submission'])
+            expected = expected_solve_seconds(challenge['difficulty'], self.hash_rate)
+            feasible = expected is None or expected <= time_left - SUBMIT_MARGIN_SECONDS
+            units.append((not feasible, time_left, address, challenge))
+        units.sort(key=lambda u: (u[0], u[1]))
+        return [(address, challenge) for infeasible, time_left, address, challenge in units]
+
+    def log_assignment(self, worker_id, address, challenge):
+        time_left = seconds_until(challenge['latest_submission'])
+        expected = expected_solve_seconds(challenge['difficulty'], self.hash_rate)
+        probability = solve_probability(challenge['difficulty'], self.hash_rate, time_left - SUBMIT_MARGIN_SECONDS)
+        probability_str = f"{probability:.0%}" if probability is not None else "unknown"
+        self.logger.info(f"Scheduler: worker {worker_id} -> wallet {address[:20]}... challenge {challenge['challenge_id']} "
+                         f"(difficulty {challenge['difficulty'][:8]}, {difficulty_zero_bits(challenge['difficulty'])} zero bits, "
+                         f"deadline in {time_left / 3600:.1f}h, expected solve {format_duration(expected)}, "
+                         f"P(solve in time) {probability_str})")
+
+
+class ForkGuard:
+    """Holds off forks while another parent thread is inside SQLite.
+
+    The sqlite3 module releases the GIL during queries, so a worker forked then
+    could inherit SQLite's global mutexes locked by a thread that does not exist
+    in the child, and hang on its first query. Tracker calls run inside
+    `with fork_guard:`, and every fork (registered with os.register_at_fork)
+    waits for those to finish while holding off new ones.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._busy = 0
+        self._forking = False
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(before=self._before_fork, after_in_parent=self._after_fork,
+                                after_in_child=self._after_fork_child)
+
+    def __enter__(self):
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            with self._cond:
+                while self._forking:
+                    self._cond.wait()
+                self._busy += 1
+        self._local.depth = depth + 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            with self._cond:
+                self._busy -= 1
+                self._cond.notify_all()
+
+    def _before_fork(self):
+        own = 1 if getattr(self._local, 'depth', 0) else 0
+        with self._cond:
+            while self._forking:
+                self._cond.wait()
+            self._forking = True
+            while self._busy > own:
+                self._cond.wait()
+
+    def _after_fork(self):
+        with self._cond:
+            self._forking = False
+            self._cond.notify_all()
+
+    def _after_fork_child(self):
+        # Only the forking thread exists in the child
+        self._cond = threading.Condition()
+        self._busy = 1 if getattr(self._local, 'depth', 0) else 0
+        self._forking = False
+
+
+fork_guard = ForkGuard()
+
+
+class ChallengeTracker:
+    """Manages challenge tracking and completion status in a SQLite database shared by all processes.
+
+    WAL mode lets readers proceed while a writer commits, and solves are indexed
+    by (wallet, challenge_id) so per-wallet lookups do not scan every challenge.
+    Query results are cached per thread until any process commits a change.
+    """
+
+    CHALLENGE_COLUMNS = ('challenge_id', 'day', 'challenge_number', 'difficulty', 'no_pre_mine',
+                         'no_pre_mine_hour', 'latest_submission', 'discovered_at', 'expected_hashes')
+
+    def __init__(self, challenges_file="challenges.db", legacy_json_file=None):
+        self.challenges_file = challenges_file
+        self._local = threading.local()
+        with fork_guard, self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS challenges (
+                    challenge_id TEXT PRIMARY KEY,
+                    day INTEGER,
+                    challenge_number INTEGER,
+                    difficulty TEXT NOT NULL,
+                    no_pre_mine TEXT NOT NULL,
+                    no_pre_mine_hour TEXT NOT NULL,
+                    latest_submission TEXT NOT NULL,
+                    deadline REAL NOT NULL,
+                    discovered_at TEXT NOT NULL,
+                    expected_hashes INTEGER
+                )""")
+            # Databases created before expected_hashes was recorded
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(challenges)")}
+            if 'expected_hashes' not in columns:
+                conn.execute("ALTER TABLE challenges ADD COLUMN expected_hashes INTEGER")
+                for challenge_id, difficulty in conn.execute("SELECT challenge_id, difficulty FROM challenges").fetchall():
+                    conn.execute("UPDATE challenges SET expected_hashes = ? WHERE challenge_id = ?",
+                                 (expected_hashes(difficulty), challenge_id))
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_challenges_deadline ON challenges (deadline)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS solves (
+                    wallet TEXT NOT NULL,
+                    challenge_id TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'solved',
+                    PRIMARY KEY (wallet, challenge_id)
+                ) WITHOUT ROWID""")
+            # 'skipped' challenges are done for the wallet but were never solved
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(solves)")}
+            if 'status' not in columns:
+                conn.execute("ALTER TABLE solves ADD COLUMN status TEXT NOT NULL DEFAULT 'solved'")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_solves_challenge ON solves (challenge_id)")
+
+        if legacy_json_file and os.path.exists(legacy_json_file):
+            self.migrate_json(legacy_json_file)
+
+    def _connect(self):
+        """Per-thread connection (the parent shares one tracker between several threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.challenges_file, timeout=60)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.cache = {}
+            self._local.data_version = None
+        return conn
+
+    def _cached(self, key, compute):
+        """Return a cached query result, recomputed once the database has changed.
+
+        PRAGMA data_version changes whenever another connection commits, so the
+        dashboard and spawn loop re-read only after a worker actually wrote something.
+        """
+        with fork_guard:
+            conn = self._connect()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version != self._local.data_version:
+                self._local.cache = {}
+                self._local.data_version = data_version
+            if key not in self._local.cache:
+                self._local.cache[key] = compute(conn)
+        return self._local.cache[key]
+
+    def _invalidate(self):
+        """Drop this thread's cache after its own write (data_version only tracks other connections)"""
+        self._local.cache = {}
+
+    @staticmethod
+    def _deadline(latest_submission):
+        return datetime.fromisoformat(latest_submission.replace('Z', '+00:00')).timestamp()
+
+    def _row_to_challenge(self, row):
+        return dict(zip(self.CHALLENGE_COLUMNS, row))
+
+    def migrate_json(self, json_file):
+        """One-shot import of a legacy challenges.json; the file is renamed once imported"""
+        with open(json_file, 'r') as f:
+            content = f.read()
+        challenges = json.loads(content) if content else {}
+
+        with fork_guard, self._connect() as conn:
             for challenge_id, data in challenges.items():
-                if wallet_address not in data['solved_by']:
-                    deadline = datetime.fromisoformat(data['latest_submission'].replace('Z', '+00:00'))
-                    time_left = (deadline - now).total_seconds()
-                    if time_left > 0:
-                        candidates.append({
-                            'challenge': data,
-                            'time_left': time_left
-                        })
-
-            if not candidates:
-                result = None
-            else:
-                candidates.sort(key=lambda x: x['time_left'], reverse=True)
-                result = candidates[0]['challenge']
+                conn.execute(
+                    "INSERT OR IGNORE INTO challenges VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (challenge_id, data.get('day'), data.get('challenge_number'), data['difficulty'],
+                     data['no_pre_mine'], data['no_pre_mine_hour'], data['latest_submission'],
+                     self._deadline(data['latest_submission']),
+                     data.get('discovered_at') or datetime.now(timezone.utc).isoformat(),
+                     expected_hashes(data['difficulty'])))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO solves (wallet, challenge_id) VALUES (?, ?)",
+                    [(wallet, challenge_id) for wallet in data.get('solved_by', [])])
+
+        os.replace(json_file, json_file + '.migrated')
+        logging.getLogger('midnight_miner').info(f"Migrated {len(challenges)} challenge(s) from {json_file} to {self.challenges_file}")
+        return len(challenges)
+
+    def register_challenge(self, challenge):
+        with fork_guard, self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO challenges VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (challenge['challenge_id'], challenge.get('day'), challenge.get('challenge_number'),
+                 challenge['difficulty'], challenge['no_pre_mine'], challenge['no_pre_mine_hour'],
+                 challenge['latest_submission'], self._deadline(challenge['latest_submission']),
+                 datetime.now(timezone.utc).isoformat(), expected_hashes(challenge['difficulty'])))
+        if cursor.rowcount == 1:
+            self._invalidate()
+            return True
+        return False
 
-            return (challenges, result)
+    def mark_solved(self, challenge_id, wallet_address, status='solved'):
+        with fork_guard, self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO solves (wallet, challenge_id, status) SELECT ?, challenge_id, ? FROM challenges WHERE challenge_id = ?",
+                (wallet_address, status, challenge_id))
+        if cursor.rowcount == 1:
+            self._invalidate()
+            return True
+        return False
+
+    def get_unsolved_challenges(self, wallet_address):
+        """Return all unexpired challenges not solved by wallet_address, most time left first"""
+        def query(conn):
+            return conn.execute(f"""
+                SELECT c.deadline, {', '.join(self.CHALLENGE_COLUMNS)} FROM challenges c
+                WHERE c.deadline > ?
+                AND NOT EXISTS (SELECT 1 FROM solves s WHERE s.wallet = ? AND s.challenge_id = c.challenge_id)
+                ORDER BY c.deadline DESC""", (time.time(), wallet_address)).fetchall()
 
-        return self._locked_operation(find_challenge)
+        # Expiry is applied after the cache so a cached result never returns an expired challenge
+        now = time.time()
+        rows = self._cached(('unsolved', wallet_address), query)
+        return [self._row_to_challenge(row[1:]) for row in rows if row[0] > now]
+
+    def get_unsolved_challenge(self, wallet_address):
+        unsolved = self.get_unsolved_challenges(wallet_address)
+        return unsolved[0] if unsolved else None
+
+    def _active_challenges(self):
+        """Unexpired challenges as (deadline, challenge), newest deadline first, and the wallets that solved each"""
+        def query(conn):
+            now = time.time()
+            rows = conn.execute(
+                f"SELECT deadline, {', '.join(self.CHALLENGE_COLUMNS)} FROM challenges WHERE deadline > ? ORDER BY deadline DESC",
+                (now,)).fetchall()
+            solvers = {}
+            for wallet, challenge_id in conn.execute(
+                    "SELECT s.wallet, s.challenge_id FROM solves s JOIN challenges c ON c.challenge_id = s.challenge_id "
+                    "WHERE c.deadline > ?", (now,)):
+                solvers.setdefault(challenge_id, set()).add(wallet)
+            return [(row[0], self._row_to_challenge(row[1:])) for row in rows], solvers
+
+        now = time.time()
+        challenges, solvers = self._cached('active', query)
+        return [(deadline, challenge) for deadline, challenge in challenges if deadline > now], solvers
+
+    def get_active_rom_keys(self, wallet_addresses=None, hash_rate=None):
+        """Return no_pre_mine keys of unexpired challenges in the order workers mine them (see order_challenges).
+
+        If wallet_addresses is given, challenges already solved by all of them are skipped.
+        """
+        challenges, solvers = self._active_challenges()
+        pending = [challenge for deadline, challenge in challenges
+                   if wallet_addresses is None or not wallet_addresses.issubset(solvers.get(challenge['challenge_id'], ()))]
+
+        keys = []
+        for challenge in order_challenges(pending, hash_rate):
+            if challenge['no_pre_mine'] not in keys:
+                keys.append(challenge['no_pre_mine'])
+        return keys
+
+    def get_wallets_with_unsolved(self, wallet_addresses):
+        """Find pending work for many wallets in one pass instead of one query per wallet.
+
+        Returns (address, unsolved challenges newest first) for every wallet with at
+        least one unexpired unsolved challenge, ordered by its soonest deadline.
+        """
+        challenges, solvers = self._active_challenges()
+
+        pending = []
+        for address in wallet_addresses:
+            unsolved = [(deadline, challenge) for deadline, challenge in challenges
+                        if address not in solvers.get(challenge['challenge_id'], ())]
+            if unsolved:
+                pending.append((unsolved[-1][0], address, [challenge for deadline, challenge in unsolved]))
+
+        pending.sort(key=lambda p: p[0])
+        return [(address, unsolved) for soonest, address, unsolved in pending]
+
+    def mark_skipped(self, challenge_id, wallet_address):
+        """Give up on a challenge for a wallet without counting it as completed"""
+        return self.mark_solved(challenge_id, wallet_address, status='skipped')
 
     def count_wallet_completions(self, wallet_addresses):
-        """Count total challenges completed by given wallet addresses"""
-        def count_completions(challenges):
-            total = 0
-            for challenge_data in challenges.values():
-                solved_by = challenge_data.get('solved_by', [])
-                for addr in solved_by:
-                    if addr in wallet_addresses:
-                        total += 1
-            return (challenges, total)
+        """Count total challenges completed by given wallet addresses (skipped ones excluded)"""
+        def query(conn):
+            return dict(conn.execute("SELECT wallet, COUNT(*) FROM solves WHERE status = 'solved' GROUP BY wallet").fetchall())
+
+        counts = self._cached('solve_counts', query)
+        return sum(count for wallet, count in counts.items() if wallet in wallet_addresses)
+
+
+def fetch_terms_message(api_base, session=None):
+    """Terms and conditions message every wallet signs"""
+    try:
+        response = (session or requests).get(f"{api_base.rstrip('/')}/TandC", timeout=15)
+        return response.json()["message"]
+    except:
+        return TERMS_MESSAGE_FALLBACK
+
+
+def generate_wallet():
+    signing_key = PaymentSigningKey.generate()
+    verification_key = PaymentVerificationKey.from_signing_key(signing_key)
+    address = Address(verification_key.hash(), network=Network.MAINNET)
+    pubkey = bytes(verification_key.to_primitive()).hex()
+
+    return {
+        'address': str(address),
+        'pubkey': pubkey,
+        'signing_key': signing_key.to_primitive().hex(),
+        'signature': None,
+        'created_at': datetime.now(timezone.utc).isoformat()
+    }
+
+
+def sign_terms_message(wallet_data, message):
+    """COSE_Sign1 signature of the terms message with the wallet's key"""
+    signing_key_bytes = bytes.fromhex(wallet_data['signing_key'])
+    signing_key = PaymentSigningKey.from_primitive(signing_key_bytes)
+    address = Address.from_primitive(wallet_data['address'])
+
+    address_bytes = bytes(address.to_primitive())
+
+    protected = {1: -8, "address": address_bytes}
+    protected_encoded = cbor2.dumps(protected)
+    unprotected = {"hashed": False}
+    payload = message.encode('utf-8')
 
-        return self._locked_operation(count_completions)
+    sig_structure = ["Signature1", protected_encoded, b'', payload]
+    to_sign = cbor2.dumps(sig_structure)
+    signature_bytes = signing_key.sign(to_sign)
+
+    cose_sign1 = [protected_encoded, unprotected, payload, signature_bytes]
+    wallet_data['signature'] = cbor2.dumps(cose_sign1).hex()
+    return wallet_data
+
+
+def create_signed_wallet(message):
+    """Generate and sign one wallet (process pool entry point)"""
+    return sign_terms_message(generate_wallet(), message)
 
 
 class WalletManager:
@@ -219,51 +1355,29 @@ class WalletManager:
         self.wallet_file = wallet_file
         self.wallets = []
         self._lock = threading.Lock()
+        self._terms_message = None
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=WALLET_REGISTER_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     def generate_wallet(self):
-        signing_key = PaymentSigningKey.generate()
-        verification_key = PaymentVerificationKey.from_signing_key(signing_key)
-        address = Address(verification_key.hash(), network=Network.MAINNET)
-        pubkey = bytes(verification_key.to_primitive()).hex()
-
-        return {
-            'address': str(address),
-            'pubkey': pubkey,
-            'signing_key': signing_key.to_primitive().hex(),
-            'signature': None,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        }
-
-    def sign_terms(self, wallet_data, api_base):
-        try:
-            response = requests.get(f"{api_base}/TandC")
-            message = response.json()["message"]
-        except:
-            message = "I agree to abide by the terms and conditions as described in version 1-0 of the Midnight scavenger mining process: 281ba5f69f4b943e3fb8a20390878a232787a04e4be22177f2472b63df01c200"
-
-        signing_key_bytes = bytes.fromhex(wallet_data['signing_key'])
-        signing_key = PaymentSigningKey.from_primitive(signing_key_bytes)
-        address = Address.from_primitive(wallet_data['address'])
-
-        address_bytes = bytes(address.to_primitive())
+        return generate_wallet()
 
-        protected = {1: -8, "address": address_bytes}
-        protected_encoded = cbor2.dumps(protected)
-        unprotected = {"hashed": False}
-        payload = message.encode('utf-8')
+    def terms_message(self, api_base):
+        """Fetched once and reused for every wallet this run"""
+        if self._terms_message is None:
+            self._terms_message = fetch_terms_message(api_base, self.session)
+        return self._terms_message
 
-        sig_structure = ["Signature1", protected_encoded, b'', payload]
-        to_sign = cbor2.dumps(sig_structure)
-        signature_bytes = signing_key.sign(to_sign)
-
-        cose_sign1 = [protected_encoded, unprotected, payload, signature_bytes]
-        wallet_data['signature'] = cbor2.dumps(cose_sign1).hex()
+    def sign_terms(self, wallet_data, api_base):
+        sign_terms_message(wallet_data, self.terms_message(api_base))
 
     def _register_wallet_with_api(self, wallet_data, api_base):
         """Register a wallet with the API. Returns True if successful or already registered."""
-        url = f"{api_base}/register/{wallet_data['address']}/{wallet_data['signature']}/{wallet_data['pubkey']}"
+        url = f"{api_base.rstrip('/')}/register/{wallet_data['address']}/{wallet_data['signature']}/{wallet_data['pubkey']}"
         try:
-            response = requests.post(url, json={})
+            response = self.session.post(url, json={}, timeout=15)
             response.raise_for_status()
             return True
         except requests.exceptions.HTTPError as e:
@@ -308,30 +1422,48 @@ class WalletManager:
                 print("="*70)
                 print()
 
-        for i in range(wallets_to_create):
-            wallet = self.generate_wallet()
-            self.sign_terms(wallet, api_base)
-            self.wallets.append(wallet)
-            print(f"  Wallet {len(self.wallets)}: {wallet['address'][:40]}...")
-
-            # Register the wallet immediately
-            print(f"    Registering wallet with API...")
-            if self._register_wallet_with_api(wallet, api_base):
-                print(f"    ✓ Registered successfully")
-            else:
-                print(f"    ✓ Already registered or registration complete")
-
-        with open(self.wallet_file, 'w') as f:
-            json.dump(self.wallets, f, indent=2)
+        new_wallets = self.provision_wallets(wallets_to_create, api_base)
+        self.wallets.extend(new_wallets)
+        self._write_wallets()
 
         print(f"✓ Total wallets: {len(self.wallets)}")
         return self.wallets
 
+    def provision_wallets(self, count, api_base):
+        """Generate, sign and register count wallets in bulk"""
+        message = self.terms_message(api_base)
+
+        # Key generation and signing are CPU-bound, so large batches use every core
+        if count >= WALLET_POOL_MIN and (os.cpu_count() or 1) > 1:
+            with ProcessPoolExecutor(mp_context=mp_context) as pool:
+                wallets = list(pool.map(create_signed_wallet, [message] * count, chunksize=max(1, count // (4 * os.cpu_count()))))
+        else:
+            wallets = [create_signed_wallet(message) for _ in range(count)]
+
+        for i, wallet in enumerate(wallets, len(self.wallets) + 1):
+            print(f"  Wallet {i}: {wallet['address'][:40]}...")
+
+        # Registration is network-bound: a few requests in flight over one session
+        print(f"    Registering {count} wallet(s) with API...")
+        with ThreadPoolExecutor(max_workers=WALLET_REGISTER_WORKERS) as executor:
+            registered = sum(executor.map(lambda wallet: self._register_wallet_with_api(wallet, api_base), wallets))
+        print(f"    ✓ {registered}/{count} registered (the rest may already be registered)")
+
+        return wallets
+
+    def _write_wallets(self):
+        """Replace the wallet file in one step so a crash never leaves it half-written"""
+        temp_file = self.wallet_file + ".tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.wallets, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.wallet_file)
+
     def save_wallets(self):
         """Save current wallet list to file"""
         with self._lock:
-            with open(self.wallet_file, 'w') as f:
-                json.dump(self.wallets, f, indent=2)
+            self._write_wallets()
 
     def add_wallet(self, wallet_data):
         """Add a new wallet to the manager"""
@@ -347,10 +1479,10 @@ class WalletManager:
     def get_wallet_with_unsolved_challenges(self, challenge_tracker):
         """Get a wallet that has unsolved challenges, or None if all wallets are done"""
         with self._lock:
-            for wallet in self.wallets:
-                unsolved = challenge_tracker.get_unsolved_challenge(wallet['address'])
-                if unsolved is not None:
-                    return wallet
+            pending = challenge_tracker.get_wallets_with_unsolved([w['address'] for w in self.wallets])
+            if pending:
+                address = pending[0][0]
+                return next(w for w in self.wallets if w['address'] == address)
         return None
 
     def create_new_wallet(self, api_base):
@@ -365,68 +1497,58 @@ class WalletManager:
         # Add to list and save
         with self._lock:
             self.wallets.append(wallet)
-            with open(self.wallet_file, 'w') as f:
-                json.dump(self.wallets, f, indent=2)
+            self._write_wallets()
 
         return wallet
 
 
 class MinerWorker:
-    """Individual mining worker for one wallet """
+    """Individual mining worker; mines one wallet at a time and keeps its ROMs between wallets"""
 
-    def __init__(self, wallet_data, worker_id, status_dict, challenge_tracker, donation_enabled=True, api_base="https://scavenger.prod.gd.midnighttge.io/"):
-        self.wallet_data = wallet_data
+    def __init__(self, wallet_data, worker_id, status_board, challenge_tracker, donation_enabled=True, api_base=DEFAULT_API_BASE, shared_roms=None, shared_rom_status=None, rom_budget=ROM_CACHE_BUDGET, pipeline_mode='auto', hash_threads=1, assigned_challenge=None, solution_queue=None, preempt_flags=None, hash_rate=None):
         self.worker_id = worker_id
-        self.address = wallet_data['address']
-        self.signature = wallet_data['signature']
-        self.pubkey = wallet_data['pubkey']
         self.api_base = api_base
-        self.status_dict = status_dict
+        self.status_board = status_board
         self.challenge_tracker = challenge_tracker
         self.donation_enabled = donation_enabled
+        self.shared_roms = shared_roms or {}
+        self.shared_rom_status = shared_rom_status if shared_rom_status is not None else {}
+        self.rom_budget = rom_budget
+        self.pipeline_mode = pipeline_mode
+        self.hash_threads = hash_threads
+        self.gil_released = None
+        self.solution_queue = solution_queue
+        self.preempt_flags = preempt_flags
+        self.preempted = False
+        # The scheduler's estimate until this worker has measured its own
+        self.measured_hash_rate = hash_rate
         self.logger = logging.getLogger('midnight_miner')
 
-        self.short_addr = self.address[:20] + "..."
+        # Disjoint slice of the nonce space for this worker
+        self.nonces = NonceAllocator(worker_id)
+        self.batch_sizer = BatchSizer()
 
-        # Track retry attempts for submission
-        self.current_challenge_id = None
-        self.current_challenge_data = None  # Store full challenge data for retries
-        self.current_nonce = None
-        self.submission_retry_count = 0
+        # ROMs inherited from the parent are shared; anything built here is private to this worker.
+        # The cache outlives each wallet so the next one starts hashing without a rebuild.
+        self.rom_cache = RomCache(self.rom_budget, self.shared_roms)
 
-        # OPTIMIZATION: Pre-generate random bytes buffer
-        self.random_buffer = bytearray(8192)
-        self.random_buffer_pos = len(self.random_buffer)
+        self.assign(wallet_data, assigned_challenge)
 
         # Initialize status
-        self.status_dict[worker_id] = {
-            'address': self.address,
-            'current_challenge': 'Starting',
-            'attempts': 0,
-            'hash_rate': 0,
-            'last_update': time.time()
-        }
-
-    def get_fast_nonce(self):
-        """OPTIMIZED: Get nonce from pre-generated buffer"""
-        if self.random_buffer_pos >= len(self.random_buffer):
-            self.random_buffer = bytearray(secrets.token_bytes(8192))
-            self.random_buffer_pos = 0
-        
-        nonce_bytes = self.random_buffer[self.random_buffer_pos:self.random_buffer_pos + 8]
-        self.random_buffer_pos += 8
-        return nonce_bytes.hex()
+        self.update_status(address=self.address, current_challenge='Starting', attempts=0, hash_rate=0,
+                           batch_size=0, batch_seconds=0, local_roms=0,
+                           rom_cache={'hits': 0, 'misses': 0, 'evictions': 0})
 
-    def get_current_challenge(self):
-        try:
-            response = requests.get(f"{self.api_base}/challenge")
-            response.raise_for_status()
-            data = response.json()
-            if data.get("code") == "active":
-                return data["challenge"]
-        except:
-            pass
-        return None
+    def assign(self, wallet_data, assigned_challenge=None):
+        """Switch to a new wallet, optionally starting with the scheduler's chosen challenge"""
+        self.wallet_data = wallet_data
+        self.address = wallet_data['address']
+        self.signature = wallet_data['signature']
+        self.pubkey = wallet_data['pubkey']
+        self.short_addr = self.address[:20] + "..."
+        self.assigned_challenge = assigned_challenge
+        # Challenges with a solution on the queue; the main process marks them solved once it has them
+        self.queued_challenges = set()
 
     def build_preimage_static_part(self, challenge, mining_address=None):
         address = mining_address if mining_address else self.address
@@ -437,131 +1559,245 @@ class MinerWorker:
         )
 
     def submit_solution(self, challenge, nonce, mining_address=None):
-        address = mining_address if mining_address else self.address
-        url = f"{self.api_base.rstrip('/')}/solution/{address}/{challenge['challenge_id']}/{nonce}"
-
-        try:
-            response = requests.post(url, json={}, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-            success = data.get("crypto_receipt") is not None
-            if success:
-                self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Solution ACCEPTED for challenge {challenge['challenge_id']}")
-            else:
-                self.logger.warning(f"Worker {self.worker_id} ({self.short_addr}): Solution REJECTED for challenge {challenge['challenge_id']} - No receipt")
-
-            return (success, True)
-        except requests.exceptions.HTTPError as e:
-            error_detail = e.response.text
-            self.logger.warning(f"Worker {self.worker_id} ({self.short_addr}): Solution REJECTED for challenge {challenge['challenge_id']} - {e.response.status_code}: {error_detail}")
-
-            # Check if this is NOT the "Solution already exists" error
-            # Save to CSV since this is a definitive rejection (not a network error)
-            if not ("Solution already exists" in error_detail):
-                # Append solution to solutions.csv
-                if not append_solution_to_csv(address, challenge['challenge_id'], nonce):
-                    self.logger.error(f"Worker {self.worker_id} ({self.short_addr}): Failed to write solution to file")
-
-            return (False, True)
-        except Exception as e:
-            self.logger.warning(f"Worker {self.worker_id} ({self.short_addr}): Solution submission error for challenge {challenge['challenge_id']} - {e}")
-            # Network error - return False and let retry logic handle CSV writing
-            return (False, False)
+        """Hand a solution to the main process's submitter without waiting for the result"""
+        self.queued_challenges.add(challenge['challenge_id'])
+        self.solution_queue.put({
+            'worker_id': self.worker_id,
+            'wallet': self.address,
+            'address': mining_address if mining_address else self.address,
+            'challenge_id': challenge['challenge_id'],
+            'latest_submission': challenge['latest_submission'],
+            'nonce': nonce,
+        })
 
     def mine_challenge_native(self, challenge, rom, max_time=3600, mining_address=None):
         start_time = time.time()
         attempts = 0
-        last_status_update = start_time
 
-        self.update_status(current_challenge=challenge['challenge_id'], attempts=0)
+        self.update_status(current_challenge=challenge['challenge_id'], attempts=0, eta_seconds=-1, p_solve=-1)
+        # A request left over from the previous challenge does not apply to this one
+        self.preempted = False
+        self.preemption_requested()
 
         preimage_static = self.build_preimage_static_part(challenge, mining_address)
         difficulty_value = int(challenge["difficulty"][:8], 16)
 
-        BATCH_SIZE = 10000  # Process 10k hashes per batch!
+        if self.hash_threads > 1:
+            self.releases_gil(rom)
+            return self.mine_threaded(challenge, rom, preimage_static, difficulty_value, start_time, max_time)
 
-        while time.time() - start_time < max_time:
-            # Generate batch of nonces
-            nonces = [self.get_fast_nonce() for _ in range(BATCH_SIZE)]
-            preimages = [nonce + preimage_static for nonce in nonces]
+        def prepare_batch():
+            batch_size = self.batch_sizer.size_for(max_time - (time.time() - start_time))
+            return build_preimages(preimage_static, self.nonces.allocate(batch_size), batch_size)
 
-            hashes = rom.hash_batch(preimages)
-            attempts += BATCH_SIZE
+        # Pipelined: a helper thread builds batch N+1 and scans batch N while batch N+1 hashes
+        pipeline = ThreadPoolExecutor(max_workers=1) if self.use_pipeline(rom) else None
+        next_batch = pipeline.submit(prepare_batch) if pipeline else None
+        pending_check = None  # (future, preimages) of the batch hashed last
 
-            # Check all results
-            for i, hash_hex in enumerate(hashes):
-                hash_value = int(hash_hex[:8], 16)
-                if (hash_value | difficulty_value) == difficulty_value:
+        try:
+            while time.time() - start_time < max_time:
+                if pipeline:
+                    preimages = next_batch.result()
+                    next_batch = pipeline.submit(prepare_batch)
+                else:
+                    preimages = prepare_batch()
+
+                batch_start = time.time()
+                hashes = rom.hash_batch(preimages)
+                self.batch_sizer.record(len(preimages), time.time() - batch_start)
+                attempts += len(preimages)
+
+                # Check all results at once - pipelined, this batch is scanned in the background
+                # and the previous batch's scan is collected instead
+                if pipeline:
+                    checked = pending_check
+                    pending_check = (pipeline.submit(find_solution, hashes, difficulty_value), preimages)
+                    found, found_preimages = (checked[0].result(), checked[1]) if checked else (-1, None)
+                else:
+                    found, found_preimages = find_solution(hashes, difficulty_value), preimages
+
+                if found >= 0:
                     elapsed = time.time() - start_time
                     hash_rate = attempts / elapsed if elapsed > 0 else 0
                     self.update_status(hash_rate=hash_rate)
-                    return nonces[i]
+                    return found_preimages[found][:16]
 
-            # Update status every 5 seconds
-            current_time = time.time()
-            if current_time - last_status_update >= 5.0:
-                elapsed = current_time - start_time
+                # Status writes go to shared memory, so report after every batch
+                elapsed = time.time() - start_time
                 hash_rate = attempts / elapsed if elapsed > 0 else 0
-                self.update_status(attempts=attempts, hash_rate=hash_rate)
-                last_status_update = current_time
+                self.update_status(attempts=attempts, hash_rate=hash_rate,
+                                   batch_size=len(preimages), batch_seconds=self.batch_sizer.last_batch_seconds,
+                                   **self.solve_estimate(challenge, hash_rate, max_time - elapsed))
+
+                if self.preemption_requested():
+                    self.preempted = True
+                    break
+
+            # The last hashed batch has not been checked yet
+            if pending_check is not None:
+                found = pending_check[0].result()
+                if found >= 0:
+                    return pending_check[1][found][:16]
+        finally:
+            if pipeline:
+                pipeline.shutdown(wait=False, cancel_futures=True)
 
         return None
 
+    def mine_threaded(self, challenge, rom, preimage_static, difficulty_value, start_time, max_time):
+        """Hash one challenge with hash_threads threads sharing this worker's ROM and nonce space"""
+        stop = threading.Event()
+        lock = threading.Lock()
+        progress = {'attempts': 0, 'nonce': None, 'batch_size': 0, 'batch_seconds': 0.0}
+
+        def hash_loop():
+            # Each thread tunes its own batch size; nonce ranges come from the shared allocator
+            sizer = BatchSizer()
+            while not stop.is_set() and time.time() - start_time < max_time:
+                batch_size = sizer.size_for(max_time - (time.time() - start_time))
+                preimages = build_preimages(preimage_static, self.nonces.allocate(batch_size), batch_size)
+
+                batch_start = time.time()
+                hashes = rom.hash_batch(preimages)
+                sizer.record(batch_size, time.time() - batch_start)
+
+                found = find_solution(hashes, difficulty_value)
+                with lock:
+                    progress['attempts'] += batch_size
+                    progress['batch_size'] = batch_size
+                    progress['batch_seconds'] = sizer.last_batch_seconds
+                    if found >= 0 and progress['nonce'] is None:
+                        progress['nonce'] = preimages[found][:16]
+                        stop.set()
+
+        threads = [threading.Thread(target=hash_loop, daemon=True) for _ in range(self.hash_threads)]
+        for thread in threads:
+            thread.start()
+
+        # Report status every second until the hashing threads finish (or we are preempted)
+        while any(thread.is_alive() for thread in threads):
+            report_at = time.time() + 1.0
+            for thread in threads:
+                thread.join(timeout=max(0.0, report_at - time.time()))
+            elapsed = time.time() - start_time
+            with lock:
+                hash_rate = progress['attempts'] / elapsed if elapsed > 0 else 0
+                self.update_status(attempts=progress['attempts'], hash_rate=hash_rate,
+                                   batch_size=progress['batch_size'], batch_seconds=progress['batch_seconds'],
+                                   **self.solve_estimate(challenge, hash_rate, max_time - elapsed))
+            if not stop.is_set() and self.preemption_requested():
+                self.preempted = True
+                stop.set()
+
+        return progress['nonce']
+
+    def preemption_requested(self):
+        """Whether the main process asked us to drop the current challenge; clears the request"""
+        if self.preempt_flags is None or not self.preempt_flags[self.worker_id]:
+            return False
+        self.preempt_flags[self.worker_id] = 0
+        return True
+
+    def solve_estimate(self, challenge, hash_rate, seconds_left):
+        """Expected time to solve and probability of solving in the remaining mining time"""
+        eta = expected_solve_seconds(challenge['difficulty'], hash_rate)
+        probability = solve_probability(challenge['difficulty'], hash_rate, seconds_left)
+        return {'eta_seconds': eta if eta is not None else -1,
+                'p_solve': probability if probability is not None else -1}
+
+    def releases_gil(self, rom):
+        """Whether the native hash_batch releases the GIL (probed once per worker)"""
+        if self.gil_released is None:
+            self.gil_released = native_releases_gil(rom)
+            self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Native hashing {'releases' if self.gil_released else 'holds'} the GIL")
+            if not self.gil_released and self.hash_threads > 1:
+                self.logger.warning(f"Worker {self.worker_id} ({self.short_addr}): ashmaize_py holds the GIL, {self.hash_threads} hashing threads will not run in parallel - use more --workers instead")
+        return self.gil_released
+
+    def use_pipeline(self, rom):
+        """Whether to overlap batch preparation with hashing (--pipeline auto|on|off)"""
+        if self.pipeline_mode == 'on':
+            return True
+        if self.pipeline_mode == 'off':
+            return False
+        # Overlap only pays off if the native call releases the GIL
+        return self.releases_gil(rom)
+
+    def find_challenge_with_rom(self, rom_cache):
+        """Return an unsolved challenge for this wallet whose ROM is already loaded, or None"""
+        for challenge in self.challenge_tracker.get_unsolved_challenges(self.address):
+            if challenge["no_pre_mine"] in rom_cache:
+                return challenge
+        return None
+
+    def update_rom_status(self, rom_cache):
+        """Report private ROM count and cache counters to the dashboard"""
+        self.update_status(local_roms=len(rom_cache.keys() - self.shared_roms.keys()),
+                           rom_cache=rom_cache.stats())
+
     def update_status(self, **kwargs):
-        current = dict(self.status_dict[self.worker_id])
-        current.update(kwargs)
-        current['last_update'] = time.time()
-        self.status_dict[self.worker_id] = current
+        if kwargs.get('hash_rate'):
+            self.measured_hash_rate = kwargs['hash_rate']
+        self.status_board.update(self.worker_id, **kwargs)
 
     def run(self):
-        """Main worker loop"""
-        self.update_status(current_challenge='Initializing...')
+        """Mine the current wallet's challenges.
+
+        Returns True once the wallet has nothing left to mine, or False when the
+        process should exit so the parent can re-fork it with a shared ROM.
+        """
+        self.update_status(address=self.address, current_challenge='Initializing...')
         self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Starting mining worker...")
 
         self.update_status(current_challenge='Ready')
-        rom_cache = {}
+        rom_cache = self.rom_cache
 
         while True:
             try:
-                # If we're retrying a submission, use the stored challenge data
-                if self.current_nonce is not None and self.current_challenge_data is not None:
-                    # In retry mode - use stored challenge
-                    challenge = self.current_challenge_data
-                    challenge_id = challenge["challenge_id"]
-                    self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Retrying submission for challenge {challenge_id} (attempt {self.submission_retry_count + 1}/3)")
-                else:
-                    # Not in retry mode - fetch new challenges
-                    # Get current challenge from API and register it
-                    api_challenge = self.get_current_challenge()
-                    if api_challenge:
-                        is_new = self.challenge_tracker.register_challenge(api_challenge)
-                        if is_new:
-                            self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Discovered new challenge {api_challenge['challenge_id']}")
-
-                    # Find an unsolved challenge for this wallet
-                    challenge = self.challenge_tracker.get_unsolved_challenge(self.address)
-
-                    if not challenge:
-                        # No more challenges available for this wallet - exit worker
-                        self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): All challenges completed, exiting worker")
-                        self.update_status(current_challenge='All completed', attempts=0, hash_rate=0)
-                        return
-
-                    challenge_id = challenge["challenge_id"]
-
-                    # Reset retry state when starting a new challenge
-                    if self.current_challenge_id != challenge_id:
-                        self.current_challenge_id = challenge_id
-                        self.current_challenge_data = None
-                        self.current_nonce = None
-                        self.submission_retry_count = 0
+                # Find an unsolved challenge for this wallet: the scheduler's assignment first,
+                # then the same deadline-aware ordering it uses
+                tracked = self.challenge_tracker.get_unsolved_challenges(self.address)
+                unsolved = [c for c in tracked if c['challenge_id'] not in self.queued_challenges]
+                assigned_id = self.assigned_challenge['challenge_id'] if self.assigned_challenge else None
+                self.assigned_challenge = None
+                challenge = next((c for c in unsolved if c['challenge_id'] == assigned_id), None)
+                if challenge is None and unsolved:
+                    challenge = order_challenges(unsolved, self.measured_hash_rate)[0]
+
+                # Give up on challenges we cannot realistically solve in time at our hash rate
+                if challenge and is_hopeless(challenge, self.measured_hash_rate):
+                    time_left = seconds_until(challenge['latest_submission']) - SUBMIT_MARGIN_SECONDS
+                    probability = solve_probability(challenge['difficulty'], self.measured_hash_rate, time_left)
+                    self.challenge_tracker.mark_skipped(challenge['challenge_id'], self.address)
+                    self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Skipping hopeless challenge {challenge['challenge_id']} (P(solve in time) {probability:.1%})")
+                    continue
+
+                # Release ROMs of expired challenges; the rest are kept since this worker moves on to other wallets
+                if rom_cache.prune(set(self.challenge_tracker.get_active_rom_keys())):
+                    self.update_rom_status(rom_cache)
+
+                if not challenge and any(c['challenge_id'] in self.queued_challenges for c in tracked):
+                    # Hand the wallet back only once the main process has recorded its solutions,
+                    # or the scheduler could give it out again for the same challenge
+                    self.update_status(current_challenge='Solution queued')
+                    time.sleep(0.5)
+                    continue
+
+                if not challenge:
+                    # No more challenges available for this wallet - ask for the next one
+                    self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): All challenges completed, requesting a new wallet")
+                    self.update_status(current_challenge='All completed', attempts=0, hash_rate=0)
+                    return True
+
+                challenge_id = challenge["challenge_id"]
 
                 # Check deadline
                 deadline = datetime.fromisoformat(challenge["latest_submission"].replace('Z', '+00:00'))
                 time_left = (deadline - datetime.now(timezone.utc)).total_seconds()
 
                 if time_left <= 0:
-                    self.challenge_tracker.mark_solved(challenge_id, self.address)
+                    self.challenge_tracker.mark_skipped(challenge_id, self.address)
                     self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Challenge {challenge_id} expired")
                     self.update_status(current_challenge='Expired')
                     time.sleep(5)
@@ -569,18 +1805,33 @@ class MinerWorker:
 
                 # Get or build ROM for this challenge
                 no_pre_mine = challenge["no_pre_mine"]
-                if no_pre_mine not in rom_cache:
-                    self.update_status(current_challenge=f'Building ROM')
-                    self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Building ROM for challenge {challenge_id}")
-                    # Use TwoStep for speed (matches WASM parameters)
-                    rom_cache[no_pre_mine] = ashmaize_py.build_rom_twostep(
-                        key=no_pre_mine,
-                        size=1073741824,
-                        pre_size=16777216,
-                        mixing_numbers=4
-                    )
-
-                rom = rom_cache[no_pre_mine]
+                rom = rom_cache.get(no_pre_mine)
+                if rom is None:
+                    rom_state = self.shared_rom_status.get(no_pre_mine)
+                    if rom_state == 'ready':
+                        # The parent already holds this ROM - exit so we are re-forked with it
+                        self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Shared ROM ready for challenge {challenge_id}, handing over to a fresh worker")
+                        self.update_status(current_challenge='Switching to shared ROM', attempts=0, hash_rate=0)
+                        return False
+                    if rom_state == 'building':
+                        # The parent is pre-building this ROM - keep hashing a challenge we already have a ROM for
+                        fallback = self.find_challenge_with_rom(rom_cache)
+                        if fallback is None:
+                            self.update_status(current_challenge='Waiting for shared ROM', hash_rate=0)
+                            time.sleep(5)
+                            continue
+                        challenge = fallback
+                        challenge_id = challenge["challenge_id"]
+                        rom = rom_cache.get(challenge["no_pre_mine"])
+                        deadline = datetime.fromisoformat(challenge["latest_submission"].replace('Z', '+00:00'))
+                        time_left = (deadline - datetime.now(timezone.utc)).total_seconds()
+                        self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Shared ROM still building, mining challenge {challenge_id} meanwhile")
+                    else:
+                        self.update_status(current_challenge=f'Building ROM')
+                        self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Building ROM for challenge {challenge_id}")
+                        rom = build_rom(no_pre_mine)
+                        rom_cache.put(no_pre_mine, rom)
+                self.update_rom_status(rom_cache)
 
                 # Determine if this challenge will be mined for developer
                 mining_for_developer = False
@@ -596,76 +1847,36 @@ class MinerWorker:
                 if not mining_for_developer:
                     self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Starting work on challenge {challenge_id} (time left: {time_left/3600:.1f}h)")
 
-                # Mine the challenge (or reuse nonce if retrying)
-                if self.current_nonce is None:
-                    max_mine_time = min(time_left * 0.8, 3600)
-                    nonce = self.mine_challenge_native(challenge, rom, max_time=max_mine_time, mining_address=mining_address)
-                    if nonce:
-                        # Store both nonce and challenge data for retry
-                        self.current_nonce = nonce
-                        self.current_challenge_data = challenge
-                else:
-                    # Retrying with previously found nonce
-                    nonce = self.current_nonce
+                # Mine the challenge
+                max_mine_time = mining_time_limit(challenge, time_left, self.measured_hash_rate)
+                nonce = self.mine_challenge_native(challenge, rom, max_time=max_mine_time, mining_address=mining_address)
 
+                if not nonce and self.preempted:
+                    # Stale work: the challenge stays unsolved and the next loop picks what is best now
+                    self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Preempted on challenge {challenge_id}, switching")
+                    self.update_status(current_challenge='Preempted')
+                    if mining_for_developer:
+                        self.update_status(address=self.address)
+                    continue
+
+                # Either way this wallet is done with the challenge. A found solution is marked solved by
+                # the main process once it has journaled it, so a worker killed before its queue flushes
+                # leaves the challenge to be mined again. Status goes first so the main process never sees
+                # us mining a challenge marked done.
                 if nonce:
+                    self.update_status(current_challenge='Solution queued')
                     if mining_for_developer:
                         self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Found solution for challenge {challenge_id} (DEVELOPER DONATION), submitting...")
                     else:
                         self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Found solution for challenge {challenge_id}, submitting...")
-                    self.update_status(current_challenge='Submitting solution...')
-                    success, should_mark_solved = self.submit_solution(challenge, nonce, mining_address=mining_address)
-
-                    if success:
-                        self.challenge_tracker.mark_solved(challenge_id, self.address)
-                        self.update_status(current_challenge='Solution accepted!')
-                        self.current_nonce = None
-                        self.current_challenge_data = None
-                        self.submission_retry_count = 0
-                        time.sleep(5)
-                    elif should_mark_solved:
-                        self.challenge_tracker.mark_solved(challenge_id, self.address)
-                        self.update_status(current_challenge='Solution rejected - moving on')
-                        self.current_nonce = None
-                        self.current_challenge_data = None
-                        self.submission_retry_count = 0
-                        time.sleep(5)
-                    else:
-                        # Network error - check retry count
-                        self.submission_retry_count += 1
-                        if self.submission_retry_count >= 2:
-                            # Max retries (2) reached, save to CSV and move on
-                            self.logger.warning(f"Worker {self.worker_id} ({self.short_addr}): Max retries (2) reached for challenge {challenge_id}, saving to solutions.csv and moving on")
-                            submission_address = mining_address if mining_address else self.address
-                            if not append_solution_to_csv(submission_address, challenge_id, nonce):
-                                self.logger.error(f"Worker {self.worker_id} ({self.short_addr}): Failed to save solution to CSV")
-
-                            self.challenge_tracker.mark_solved(challenge_id, self.address)
-                            self.update_status(current_challenge='Saved to CSV, moving on')
-                            self.current_nonce = None
-                            self.current_challenge_data = None
-                            self.submission_retry_count = 0
-                            time.sleep(5)
-                        else:
-                            # Retry again (will retry on next loop iteration)
-                            self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Submission failed, will retry (attempt {self.submission_retry_count + 1}/3)")
-                            self.update_status(current_challenge=f'Submission error - will retry')
-                            time.sleep(15)
-
-                    if mining_for_developer:
-                        self.update_status(address=self.address)
+                    self.submit_solution(challenge, nonce, mining_address=mining_address)
                 else:
-                    self.challenge_tracker.mark_solved(challenge_id, self.address)
-                    self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): No solution found for challenge {challenge_id} within time limit")
                     self.update_status(current_challenge='No solution found')
-                    self.current_nonce = None
-                    self.current_challenge_data = None
-                    self.submission_retry_count = 0
-
-                    if mining_for_developer:
-                        self.update_status(address=self.address)
+                    self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): No solution found for challenge {challenge_id} within time limit")
+                    self.challenge_tracker.mark_skipped(challenge_id, self.address)
 
-                    time.sleep(5)
+                if mining_for_developer:
+                    self.update_status(address=self.address)
 
             except KeyboardInterrupt:
                 self.logger.info(f"Worker {self.worker_id} ({self.short_addr}): Received stop signal")
@@ -676,19 +1887,34 @@ class MinerWorker:
                 time.sleep(60)
 
 
-def worker_process(wallet_data, worker_id, status_dict, challenges_file, donation_enabled=True):
-    """Process entry point for worker"""
+def worker_process(wallet_data, worker_id, status_board, challenges_file, donation_enabled=True, shared_roms=None, shared_rom_status=None, rom_budget=ROM_CACHE_BUDGET, pipeline_mode='auto', hash_threads=1, assigned_challenge=None, solution_queue=None, conn=None, preempt_flags=None, hash_rate=None):
+    """Process entry point for worker
+
+    The process stays alive between wallets: when a wallet is finished it reports
+    idle on conn and waits for the next (wallet, challenge) assignment, or None to exit.
+    """
     try:
         setup_logging()
+        # Own connections: SQLite connections inherited from the parent must not be used across fork
         challenge_tracker = ChallengeTracker(challenges_file)
-        worker = MinerWorker(wallet_data, worker_id, status_dict, challenge_tracker, donation_enabled=donation_enabled)
-        worker.run()
+        worker = MinerWorker(wallet_data, worker_id, status_board, challenge_tracker, donation_enabled=donation_enabled, shared_roms=shared_roms, shared_rom_status=shared_rom_status, rom_budget=rom_budget, pipeline_mode=pipeline_mode, hash_threads=hash_threads, assigned_challenge=assigned_challenge, solution_queue=solution_queue, preempt_flags=preempt_flags, hash_rate=hash_rate)
+        while worker.run() and conn is not None:
+            worker.update_status(current_challenge='Waiting for wallet')
+            conn.send(worker.address)
+            assignment = conn.recv()
+            if assignment is None:
+                break
+            worker.assign(*assignment)
+    except (EOFError, KeyboardInterrupt):
+        pass
     except Exception as e:
         logger = logging.getLogger('midnight_miner')
         logger.error(f"Worker {worker_id}: Fatal error - {e}")
         import traceback
         traceback.print_exc()
 
+DASHBOARD_WIDTH = 128
+
 RESET = "\033[0m"
 BOLD = "\033[1m"
 CYAN = "\033[36m"
@@ -698,7 +1924,7 @@ GREEN = "\033[32m"
 def color_text(text, color):
     return f"{color}{text}{RESET}"
 
-def display_dashboard(status_dict, num_workers, wallet_manager, challenge_tracker, initial_completed, night_balance_dict, api_base):
+def display_dashboard(status_board, num_workers, wallet_manager, challenge_tracker, initial_completed, night_balance_dict, api_base, rom_coordinator=None, submitter=None, stats_fetcher=None):
     """Display live dashboard - worker-centric view with real-time statistics"""
     
     # Non-blocking keyboard input handler
@@ -719,11 +1945,20 @@ def display_dashboard(status_dict, num_workers, wallet_manager, challenge_tracke
             pass
         return False
     
+    stats_fetcher = stats_fetcher or WalletStatsFetcher(api_base)
+
+    def refresh_night_balance():
+        night_balance_dict['balance'] = fetch_total_night_balance(wallet_manager, api_base, stats_fetcher, force=True)
+
+    # Lines left in solutions.csv for resubmit_solutions.py, recounted only when the file changes
+    saved_signature = None
+    saved_count = 0
+
     while True:
         try:
             # Check for 'E' key press to show earnings
             if check_keyboard_input():
-                display_wallet_earnings(wallet_manager, api_base)
+                display_wallet_earnings(wallet_manager, api_base, stats_fetcher)
                 # Continue to dashboard after earnings view
             
             time.sleep(5)
@@ -735,40 +1970,42 @@ def display_dashboard(status_dict, num_workers, wallet_manager, challenge_tracke
 
             # Update if: different date AND current time is after 2am UTC AND we haven't updated today
             if now_utc.hour >= 2 and last_update_str != current_date:
-                new_balance = fetch_total_night_balance(wallet_manager, api_base)
-                night_balance_dict['balance'] = new_balance
+                # Refresh in the background so the dashboard keeps updating meanwhile
                 night_balance_dict['last_update_date'] = current_date
+                threading.Thread(target=refresh_night_balance, daemon=True).start()
 
             os.system('clear' if os.name == 'posix' else 'cls')
 
-            print("="*110)
-            print(f"{BOLD}{CYAN}{f'MIDNIGHT MINER - v{VERSION}':^110}{RESET}")
-            print("="*110)
+            print("="*DASHBOARD_WIDTH)
+            print(f"{BOLD}{CYAN}{f'MIDNIGHT MINER - v{VERSION}':^{DASHBOARD_WIDTH}}{RESET}")
+            print("="*DASHBOARD_WIDTH)
             print(f"{BOLD}Active Workers: {num_workers} | Last Update: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{RESET}")
-            print("="*110)
+            print("="*DASHBOARD_WIDTH)
             print()
 
             # Worker status table
-            header = f"{'ID':<4} {'Address':<44} {'Challenge':<25} {'Attempts':<12} {'H/s':<10}"
+            header = f"{'ID':<4} {'Address':<44} {'Challenge':<25} {'Attempts':<12} {'H/s':<10} {'Batch':<12} {'ETA / P':<14}"
             print(color_text(header, CYAN))
-            print("-"*110)
+            print("-"*DASHBOARD_WIDTH)
 
             total_hashrate = 0
             active_workers = 0
+            local_roms = 0
+            rom_counters = rom_coordinator.stats() if rom_coordinator else {'hits': 0, 'misses': 0, 'evictions': 0}
 
             for worker_id in range(num_workers):
-                if worker_id not in status_dict:
-                    row = f"{worker_id:<4} {'Starting...':<44} {'N/A':<25} {0:<12} {0:<10}"
+                status = status_board.read(worker_id)
+                if status is None:
+                    row = f"{worker_id:<4} {'Starting...':<44} {'N/A':<25} {0:<12} {0:<10} {'N/A':<12} {'N/A':<14}"
                     print(row)
                     continue
 
-                status = status_dict[worker_id]
                 address = status.get('address', 'N/A')
                 if len(address) > 42:
                     address = address[:39] + "..."
 
                 challenge = status.get('current_challenge')
-                if challenge is None:
+                if not challenge:
                     challenge_display = "Waiting"
                 elif len(str(challenge)) > 23:
                     challenge_display = str(challenge)[:20] + "..."
@@ -781,12 +2018,23 @@ def display_dashboard(status_dict, num_workers, wallet_manager, challenge_tracke
                 hash_rate = status.get('hash_rate', 0) or 0
 
                 total_hashrate += hash_rate
+                local_roms += status.get('local_roms', 0) or 0
+                for counter in rom_counters:
+                    rom_counters[counter] += status.get(f'rom_{counter}', 0)
                 if hash_rate > 0:
                     active_workers += 1
 
-                print(f"{worker_id:<4} {address:<44} {challenge_display_padded} {attempts:<12,} {hash_rate:<10.0f}")
+                batch_size = status.get('batch_size')
+                batch_display = f"{batch_size:,}/{status.get('batch_seconds', 0):.1f}s" if batch_size else 'N/A'
+
+                # Expected time to a solution and chance of finding it before the worker gives up
+                eta = status.get('eta_seconds', -1)
+                p_solve = status.get('p_solve', -1)
+                estimate_display = f"{format_duration(eta)} / {p_solve:.0%}" if eta > 0 and p_solve >= 0 else 'N/A'
 
-            print(color_text("-"*110, CYAN))
+                print(f"{worker_id:<4} {address:<44} {challenge_display_padded} {attempts:<12,} {hash_rate:<10.0f} {batch_display:<12} {estimate_display:<14}")
+
+            print(color_text("-"*DASHBOARD_WIDTH, CYAN))
             print()
 
             # Summary statistics
@@ -805,17 +2053,30 @@ def display_dashboard(status_dict, num_workers, wallet_manager, challenge_tracke
             print(color_text(f"{'Active Workers:':<20} {active_workers}/{num_workers}", CYAN))
             print(color_text(f"{'Total Completed:':<20} {completed_str}", CYAN))
             print(color_text(f"{'Total NIGHT:':<20} {night_balance:.2f}", GREEN))
-            
-            # Mining statistics from solutions.csv
-            if os.path.exists("solutions.csv"):
-                try:
+
+            # ROM memory: shared ROMs are counted once, worker-built ROMs once per copy
+            shared_rom_bytes = rom_coordinator.memory_usage() if rom_coordinator else 0
+            rom_summary = f"{format_gib(shared_rom_bytes)} shared"
+            if local_roms > 0:
+                rom_summary += f" + {format_gib(local_roms * ROM_SIZE)} private ({local_roms} worker-built)"
+            print(color_text(f"{'ROM Memory:':<20} {rom_summary}", CYAN))
+            print(color_text(f"{'ROM Cache:':<20} {rom_counters['hits']:,} hits / {rom_counters['misses']:,} misses / {rom_counters['evictions']:,} evictions", CYAN))
+            if submitter:
+                # All-time totals from the solution journal's counters, no file scan
+                counts = submitter.journal.snapshot()
+                print(color_text(f"{'Solutions:':<20} {counts['found']} found / {counts['accepted']} accepted / "
+                                 f"{counts['rejected']} rejected / {submitter.pending()} retrying", CYAN))
+
+            try:
+                stat = os.stat("solutions.csv")
+                if (stat.st_size, stat.st_mtime_ns) != saved_signature:
                     with open("solutions.csv", 'r') as f:
-                        solutions = f.readlines()
-                        solution_count = len(solutions)
-                        if solution_count > 0:
-                            print(color_text(f"{'Solutions Saved:':<20} {solution_count} (pending resubmission)", CYAN))
-                except:
-                    pass
+                        saved_count = sum(1 for line in f if line.strip())
+                    saved_signature = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                saved_signature, saved_count = None, 0
+            if saved_count > 0:
+                print(color_text(f"{'Solutions Saved:':<20} {saved_count} (pending resubmission)", CYAN))
             
             # Wallet count
             total_wallets = len(wallet_manager.wallets)
@@ -824,7 +2085,7 @@ def display_dashboard(status_dict, num_workers, wallet_manager, challenge_tracke
             # Per-wallet earnings breakdown
             print(color_text(f"{'Per-Wallet Earnings:':<20} Press 'E' to view breakdown", CYAN))
             
-            print("="*110)
+            print("="*DASHBOARD_WIDTH)
             print("NIGHT balance updates every 24h after 2am UTC")
             print("\nPress Ctrl+C to stop all miners")
 
@@ -835,18 +2096,91 @@ def display_dashboard(status_dict, num_workers, wallet_manager, challenge_tracke
             time.sleep(5)
 
 
-def get_wallet_statistics(wallet_address, api_base):
+def get_wallet_statistics(wallet_address, api_base, session=None):
     """Fetch statistics for a single wallet"""
     try:
-        response = requests.get(f"{api_base}/statistics/{wallet_address}", timeout=5)
+        response = (session or requests).get(f"{api_base}/statistics/{wallet_address}", timeout=5)
         response.raise_for_status()
         return response.json()
     except Exception:
         return None
 
 
-def display_wallet_earnings(wallet_manager, api_base):
+class WalletStatsFetcher:
+    """Fetches wallet statistics concurrently over one keep-alive session
+
+    Successful results are cached per wallet for STATS_CACHE_TTL seconds and the
+    cache is saved to disk, so restarts and the earnings view reuse recent data.
+    """
+
+    def __init__(self, api_base, cache_file="wallet_stats.json", ttl=STATS_CACHE_TTL, max_workers=STATS_FETCH_WORKERS):
+        self.api_base = api_base.rstrip('/')
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self.cache = {}
+        if os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'r') as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError):
+                self.cache = {}
+
+    def cached(self, address):
+        with self._lock:
+            entry = self.cache.get(address)
+        if entry and time.time() - entry['fetched_at'] < self.ttl:
+            return entry['stats']
+        return None
+
+    def save(self):
+        with self._lock:
+            data = json.dumps(self.cache)
+        temp_file = self.cache_file + ".tmp"
+        try:
+            with open(temp_file, 'w') as f:
+                f.write(data)
+            os.replace(temp_file, self.cache_file)
+        except OSError:
+            pass
+
+    def _fetch(self, address):
+        stats = get_wallet_statistics(address, self.api_base, session=self.session)
+        if stats is not None:
+            with self._lock:
+                self.cache[address] = {'fetched_at': time.time(), 'stats': stats}
+        return stats
+
+    def fetch_many(self, addresses, force=False):
+        """Yield (address, stats or None) as results arrive, cached ones first"""
+        to_fetch = []
+        for address in addresses:
+            stats = None if force else self.cached(address)
+            if stats is not None:
+                yield address, stats
+            else:
+                to_fetch.append(address)
+
+        if to_fetch:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self._fetch, address): address for address in to_fetch}
+                try:
+                    for future in as_completed(futures):
+                        yield futures[future], future.result()
+                finally:
+                    for future in futures:
+                        future.cancel()
+            self.save()
+
+
+def display_wallet_earnings(wallet_manager, api_base, stats_fetcher=None):
     """Display per-wallet earnings breakdown"""
+    stats_fetcher = stats_fetcher or WalletStatsFetcher(api_base)
     os.system('clear' if os.name == 'posix' else 'cls')
     
     print("="*110)
@@ -861,12 +2195,14 @@ def display_wallet_earnings(wallet_manager, api_base):
     total_challenges = 0
     success_count = 0
     failed_count = 0
-    
-    for i, wallet in enumerate(wallet_manager.wallets, 1):
-        address = wallet['address']
+
+    with wallet_manager._lock:
+        addresses = [wallet['address'] for wallet in wallet_manager.wallets]
+
+    # Rows are printed as each wallet's statistics arrive
+    for address, stats in stats_fetcher.fetch_many(addresses):
         short_addr = address[:42] + "..." if len(address) > 42 else address
         
-        stats = get_wallet_statistics(address, api_base)
         if stats:
             local = stats.get('local', {})
             global_stats = stats.get('global', {})
@@ -894,7 +2230,7 @@ def display_wallet_earnings(wallet_manager, api_base):
     print("="*110)
     
     if failed_count > 0:
-        print(f"\n{BOLD}Note:{RESET} Failed to fetch {failed_count}/{len(wallet_manager.wallets)} wallets")
+        print(f"\n{BOLD}Note:{RESET} Failed to fetch {failed_count}/{len(addresses)} wallets")
     
     print("\nPress any key to return to dashboard...")
     try:
@@ -910,14 +2246,17 @@ def display_wallet_earnings(wallet_manager, api_base):
         input()
 
 
-def fetch_total_night_balance(wallet_manager, api_base):
-    """Fetch total NIGHT balance across all wallets once at startup"""
+def fetch_total_night_balance(wallet_manager, api_base, stats_fetcher=None, force=False):
+    """Fetch total NIGHT balance across all wallets"""
+    stats_fetcher = stats_fetcher or WalletStatsFetcher(api_base)
     total_night = 0.0
     failed_count = 0
     success_count = 0
 
-    for wallet in wallet_manager.wallets:
-        stats = get_wallet_statistics(wallet['address'], api_base)
+    with wallet_manager._lock:
+        addresses = [wallet['address'] for wallet in wallet_manager.wallets]
+
+    for address, stats in stats_fetcher.fetch_many(addresses, force=force):
         if stats:
             local = stats.get('local', {})
             night = local.get('night_allocation', 0) / 1000000.0
@@ -927,7 +2266,7 @@ def fetch_total_night_balance(wallet_manager, api_base):
             failed_count += 1
 
     if failed_count > 0:
-        print(f"[WARNING] Failed to fetch stats for {failed_count}/{len(wallet_manager.wallets)} wallets.")
+        print(f"[WARNING] Failed to fetch stats for {failed_count}/{len(addresses)} wallets.")
         print(f"[INFO] Successfully fetched {success_count} wallets. Showing available balance.")
 
     return total_night
@@ -937,11 +2276,39 @@ def main():
     """Main entry point with continuous worker spawning"""
     logger = setup_logging()
 
+    num_workers = 1
+    wallets_file = "wallets.json"
+    challenges_file = "challenges.db"
+    donation_enabled = True
+    rom_budget = ROM_CACHE_BUDGET
+    pipeline_mode = 'auto'
+    hash_threads = 1
+    api_base = DEFAULT_API_BASE
+
+    for i, arg in enumerate(sys.argv):
+        if arg == '--workers' and i + 1 < len(sys.argv):
+            num_workers = int(sys.argv[i + 1])
+        elif arg == '--wallets-file' and i + 1 < len(sys.argv):
+            wallets_file = sys.argv[i + 1]
+        elif arg == '--challenges-file' and i + 1 < len(sys.argv):
+            challenges_file = sys.argv[i + 1]
+        elif arg == '--no-donation':
+            donation_enabled = False
+        elif arg == '--rom-budget' and i + 1 < len(sys.argv):
+            rom_budget = int(float(sys.argv[i + 1]) * 1073741824)
+        elif arg == '--pipeline' and i + 1 < len(sys.argv):
+            pipeline_mode = sys.argv[i + 1]
+        elif arg == '--threads' and i + 1 < len(sys.argv):
+            hash_threads = int(sys.argv[i + 1])
+        elif arg == '--api-base' and i + 1 < len(sys.argv):
+            api_base = sys.argv[i + 1]
+
     # Check if mining period has ended (Nov 22, 2025)
     cutoff_date = datetime(2025, 11, 22, tzinfo=timezone.utc)
     now_utc = datetime.now(timezone.utc)
     
-    if now_utc >= cutoff_date:
+    # A different --api-base (e.g. mock_server.py) keeps working for testing
+    if now_utc >= cutoff_date and api_base == DEFAULT_API_BASE:
         print("="*70)
         print("MIDNIGHT MINER - AIRDROP ENDED")
         print("="*70)
@@ -966,36 +2333,41 @@ def main():
     logger.info("Midnight Miner starting up ...")
     logger.info("="*70)
 
-    num_workers = 1
-    wallets_file = "wallets.json"
-    challenges_file = "challenges.json"
-    donation_enabled = True
-
-    for i, arg in enumerate(sys.argv):
-        if arg == '--workers' and i + 1 < len(sys.argv):
-            num_workers = int(sys.argv[i + 1])
-        elif arg == '--wallets-file' and i + 1 < len(sys.argv):
-            wallets_file = sys.argv[i + 1]
-        elif arg == '--challenges-file' and i + 1 < len(sys.argv):
-            challenges_file = sys.argv[i + 1]
-        elif arg == '--no-donation':
-            donation_enabled = False
+    # Challenges now live in SQLite; an old .json path selects the database next to it
+    if challenges_file.endswith('.json'):
+        challenges_file = os.path.splitext(challenges_file)[0] + '.db'
 
     if num_workers < 1:
         print("Error: --workers must be at least 1")
         return 1
 
+    if hash_threads < 1:
+        print("Error: --threads must be at least 1")
+        return 1
+
+    if pipeline_mode not in ('auto', 'on', 'off'):
+        print("Error: --pipeline must be one of auto, on, off")
+        return 1
+
+    if rom_budget < ROM_SIZE:
+        print(f"Error: --rom-budget must be at least {format_gib(ROM_SIZE)} (one ROM)")
+        return 1
+
     print(f"Configuration:")
     print(f"  Workers: {num_workers}")
     print(f"  Wallets file: {wallets_file}")
     print(f"  Challenges file: {challenges_file}")
     print(f"  Developer donations: {'Enabled (5%)' if donation_enabled else 'Disabled'}")
+    print(f"  ROM cache budget: {format_gib(rom_budget)}")
+    print(f"  Batch pipelining: {pipeline_mode}")
+    print(f"  Hashing threads per worker: {hash_threads}")
+    if api_base != DEFAULT_API_BASE:
+        print(f"  API: {api_base}")
     print()
 
-    logger.info(f"Configuration: workers={num_workers}")
+    logger.info(f"Configuration: workers={num_workers}, threads={hash_threads}")
 
     wallet_manager = WalletManager(wallets_file)
-    api_base = "https://scavenger.prod.gd.midnighttge.io/"
 
     # Load existing wallets or create enough for all workers
     wallets = wallet_manager.load_or_create_wallets(num_workers, api_base, donation_enabled)
@@ -1003,9 +2375,18 @@ def main():
 
     # Fetch initial statistics
     print("\nFetching initial statistics...")
-    challenge_tracker = ChallengeTracker(challenges_file)
-    initial_night = fetch_total_night_balance(wallet_manager, api_base)
+    # Imports a legacy challenges.json next to the database the first time
+    challenge_tracker = ChallengeTracker(challenges_file, legacy_json_file=os.path.splitext(challenges_file)[0] + '.json')
+    stats_fetcher = WalletStatsFetcher(api_base)
+    initial_night = fetch_total_night_balance(wallet_manager, api_base, stats_fetcher)
     initial_completed = wallet_manager.count_total_challenges(challenge_tracker)
+
+    # Register the current challenge up front so its ROM can be built once here; from then on
+    # only this watcher polls the API and workers pick challenges up from the database
+    rom_prebuild_wakeup = threading.Event()
+    challenge_watcher = ChallengeWatcher(api_base, challenge_tracker,
+                                         on_new_challenge=lambda challenge: rom_prebuild_wakeup.set())
+    challenge_watcher.poll()
     print(f"✓ Initial NIGHT balance: {initial_night:.2f}")
     print(f"✓ Initial challenges completed: {initial_completed}")
 
@@ -1016,15 +2397,43 @@ def main():
     print()
 
     manager = Manager()
-    status_dict = manager.dict()
+    status_board = WorkerStatusBoard(num_workers)
 
     # NIGHT balance tracking with daily updates
     night_balance_dict = manager.dict()
     night_balance_dict['balance'] = initial_night
     night_balance_dict['last_update_date'] = datetime.now(timezone.utc).date().isoformat()
 
+    # Shared ROMs built once here and inherited by every worker
+    rom_status = manager.dict()
+    rom_coordinator = RomCoordinator(rom_status=rom_status, max_bytes=rom_budget)
+    # Never pre-build more ROMs than the budget holds, or each build evicts the one before it
+    warm_limit = min(ROM_WARM_LIMIT, rom_budget // ROM_SIZE)
+    if not rom_coordinator.enabled:
+        logger.info("ROM sharing unavailable on this platform, each worker builds its own ROM")
+    else:
+        # Restarts resume on challenges we already know about, so build their ROMs once
+        # here rather than having every worker stall in 'Building ROM'
+        print("Building ROMs for active challenges...")
+        warmed = rom_coordinator.warm(challenge_tracker, limit=warm_limit)
+        print(f"✓ {warmed} ROM(s) ready ({format_gib(rom_coordinator.memory_usage())} shared)")
+        print()
+
+    # Central (wallet, challenge) dispatch for idle workers
+    scheduler = ChallengeScheduler(challenge_tracker)
+
+    # Workers hand solutions to this and keep mining while it submits them
+    submitter = SolutionSubmitter(api_base, journal=SolutionJournal(), challenge_tracker=challenge_tracker)
+    submitter.start()
+
     # Worker tracking: worker_id -> (process, wallet_data)
     workers = {}
+    # Persistent workers: assignment pipe, ROM keys inherited at fork, and which are waiting for a wallet
+    worker_conns = {}
+    worker_roms = {}
+    waiting_workers = set()
+    # Set by the main process, checked by each worker after every batch
+    preempt_flags = mp_context.RawArray('b', num_workers)
     shutdown_event = threading.Event()
     worker_lock = threading.Lock()
 
@@ -1032,65 +2441,188 @@ def main():
         """Get set of wallet addresses currently in use by workers"""
         used_addresses = set()
         for worker_id, (process, wallet) in workers.items():
-            if process.is_alive():
+            if process.is_alive() and worker_id not in waiting_workers:
                 used_addresses.add(wallet['address'])
         return used_addresses
 
-    def spawn_worker(worker_id):
-        """Spawn a new worker with a unique wallet"""
-        with worker_lock:
-            # Get wallets currently in use
-            used_addresses = get_currently_used_wallets()
-
-            # Try to find a wallet with unsolved challenges that's not currently in use
-            wallet = None
-            with wallet_manager._lock:
-                for w in wallet_manager.wallets:
-                    if w['address'] not in used_addresses:
-                        unsolved = challenge_tracker.get_unsolved_challenge(w['address'])
-                        if unsolved is not None:
-                            wallet = w
-                            break
-
-            if wallet is None:
+    def start_worker(worker_id, wallet, challenge=None):
+        if worker_id in waiting_workers:
+            waiting_workers.discard(worker_id)
+            process = workers[worker_id][0]
+            no_pre_mine = challenge['no_pre_mine'] if challenge else None
+            # Reuse the running process unless the ROM it needs is shared but was built after it forked
+            if process.is_alive() and (no_pre_mine is None or no_pre_mine in worker_roms[worker_id]
+                                       or no_pre_mine not in rom_coordinator.snapshot()):
+                worker_conns[worker_id].send((wallet, challenge))
+                workers[worker_id] = (process, wallet)
+                logger.info(f"Assigned wallet {wallet['address'][:20]}... to worker {worker_id}")
+                return
+            try:
+                worker_conns[worker_id].send(None)
+            except OSError:
+                pass
+            process.join(timeout=5)
+            worker_conns[worker_id].close()
+
+        shared_roms = rom_coordinator.snapshot()
+        parent_conn, child_conn = mp_context.Pipe()
+        p = mp_context.Process(target=worker_process, args=(wallet, worker_id, status_board, challenges_file, donation_enabled, shared_roms, rom_status, rom_budget, pipeline_mode, hash_threads, challenge, submitter.queue, child_conn, preempt_flags, scheduler.hash_rate))
+        p.start()
+        child_conn.close()
+        workers[worker_id] = (p, wallet)
+        worker_conns[worker_id] = parent_conn
+        worker_roms[worker_id] = set(shared_roms)
+        logger.info(f"Started worker {worker_id} with wallet {wallet['address'][:20]}...")
+
+    def shared_rom_keys():
+        """ROM keys to keep shared: the first warm_limit in the order workers will mine them.
+
+        Challenges every current wallet has solved still count, since the next new wallet starts on them.
+        """
+        return challenge_tracker.get_active_rom_keys(hash_rate=scheduler.hash_rate)[:warm_limit]
+
+    def spawn_workers(worker_ids):
+        """Give each idle worker the scheduler's next (wallet, challenge) work unit
+
+        Only the manager thread calls this. ROM builds and wallet creation run outside
+        worker_lock, which is held just to start each worker, so shutdown never waits
+        on a 1 GiB build.
+        """
+        # Get wallets currently in use
+        used_addresses = get_currently_used_wallets()
+
+        # One bulk query covers every free wallet
+        with wallet_manager._lock:
+            free_wallets = {w['address']: w for w in wallet_manager.wallets if w['address'] not in used_addresses}
+        scheduler.update_hash_rate(status_board)
+        work_units = scheduler.plan(list(free_wallets))
+
+        for worker_id in worker_ids:
+            if shutdown_event.is_set():
+                return
+            challenge = None
+            if work_units:
+                address, challenge = work_units.pop(0)
+                wallet = free_wallets[address]
+                scheduler.log_assignment(worker_id, address, challenge)
+                # Build the ROM the worker is about to need before forking it, unless it falls
+                # outside the shared set the pre-builder keeps (that would evict one of those)
+                if challenge['no_pre_mine'] in shared_rom_keys():
+                    rom_coordinator.ensure(challenge['no_pre_mine'])
+            elif not challenge_tracker.get_active_rom_keys():
+                # Nothing to mine until the watcher registers a challenge; retried on the next pass
+                continue
+            else:
                 # No available wallet found, create a new one
                 logger.info(f"No available wallets for worker {worker_id}, creating new wallet")
                 wallet = wallet_manager.create_new_wallet(api_base)
                 logger.info(f"Created new wallet {wallet['address'][:20]}... for worker {worker_id}")
 
-            p = Process(target=worker_process, args=(wallet, worker_id, status_dict, challenges_file, donation_enabled))
-            p.start()
-            workers[worker_id] = (p, wallet)
-            logger.info(f"Started worker {worker_id} with wallet {wallet['address'][:20]}...")
-            return wallet
+            with worker_lock:
+                # Workers terminated at shutdown must not be replaced
+                if shutdown_event.is_set():
+                    return
+                start_worker(worker_id, wallet, challenge)
+
+    def preempt_stale_workers():
+        """Signal workers whose current challenge is no longer the one they would pick for their wallet"""
+        scheduler.update_hash_rate(status_board)
+        for worker_id, (process, wallet) in list(workers.items()):
+            if worker_id in waiting_workers or preempt_flags[worker_id] or not process.is_alive():
+                continue
+            status = status_board.read(worker_id)
+            if not status or status['state_name'] != 'Mining':
+                continue
+
+            # Same choice the worker makes: solved, expired or outranked challenges are stale
+            unsolved = challenge_tracker.get_unsolved_challenges(wallet['address'])
+            best = order_challenges(unsolved, status['hash_rate'] or scheduler.hash_rate)[0] if unsolved else None
+            if best is not None and best['challenge_id'] == status['current_challenge']:
+                continue
+            # Workers mine another challenge while the shared ROM for the best one is built
+            if best is not None and rom_status.get(best['no_pre_mine']) == 'building':
+                continue
+
+            preempt_flags[worker_id] = 1
+            logger.info(f"Preempting worker {worker_id}: challenge {status['current_challenge']} -> "
+                        f"{best['challenge_id'] if best else 'none left'}")
 
     def worker_manager():
-        """Monitor and respawn workers as they complete"""
+        """Hand new wallets to workers as they finish, and respawn any that exit"""
         while not shutdown_event.is_set():
             try:
-                time.sleep(10)  # Check every 10 seconds
+                # Wake as soon as any worker asks for a wallet or exits (e.g. handing over to a
+                # shared ROM), or every 10 seconds
+                waitables = [process.sentinel for process, wallet in workers.values()]
+                waitables += [conn for worker_id, conn in worker_conns.items() if worker_id not in waiting_workers]
+                if waitables:
+                    multiprocessing.connection.wait(waitables, timeout=10)
+                else:
+                    time.sleep(10)
 
-                # Check each worker
+                # Collect idle workers, then assign wallets to all of them at once
+                idle_workers = []
                 for worker_id in range(num_workers):
                     if worker_id not in workers:
                         # Worker needs to be started
-                        spawn_worker(worker_id)
-                    else:
-                        process, wallet = workers[worker_id]
-                        if not process.is_alive():
-                            # Worker has exited, respawn with different wallet
-                            logger.info(f"Worker {worker_id} (wallet {wallet['address'][:20]}...) has exited, respawning...")
-                            process.join(timeout=1)
-                            spawn_worker(worker_id)
+                        idle_workers.append(worker_id)
+                        continue
+
+                    process, wallet = workers[worker_id]
+                    if not process.is_alive():
+                        # Worker has exited, respawn with different wallet
+                        logger.info(f"Worker {worker_id} (wallet {wallet['address'][:20]}...) has exited, respawning...")
+                        process.join(timeout=1)
+                        worker_conns.pop(worker_id).close()
+                        waiting_workers.discard(worker_id)
+                        idle_workers.append(worker_id)
+                    elif worker_id in waiting_workers:
+                        # Still waiting from an earlier round that could not assign it
+                        idle_workers.append(worker_id)
+                    elif worker_conns[worker_id].poll():
+                        # Finished its wallet; the process stays up with its ROMs loaded
+                        try:
+                            worker_conns[worker_id].recv()
+                        except EOFError:
+                            # Exiting (e.g. handing over to a shared ROM); respawned once it is gone
+                            continue
+                        logger.info(f"Worker {worker_id} finished wallet {wallet['address'][:20]}..., assigning a new one")
+                        waiting_workers.add(worker_id)
+                        idle_workers.append(worker_id)
+
+                if idle_workers:
+                    spawn_workers(idle_workers)
+
+                preempt_stale_workers()
 
             except Exception as e:
                 logger.error(f"Error in worker manager: {e}")
                 time.sleep(5)
 
     # Start initial workers
-    for i in range(num_workers):
-        spawn_worker(i)
-        time.sleep(1)
+    spawn_workers(range(num_workers))
+
+    def rom_prebuilder():
+        """Build ROMs for newly registered challenges while workers keep mining the previous one"""
+        while not shutdown_event.is_set():
+            try:
+                # Only expired challenges free their ROMs; rebuilding one for a new wallet would
+                # leave forked workers holding separate copies of the same key
+                rom_coordinator.prune(set(challenge_tracker.get_active_rom_keys()))
+                # Same ranking as spawn_workers and the workers themselves, so neither evicts the other's ROMs
+                for no_pre_mine in shared_rom_keys():
+                    rom_coordinator.ensure(no_pre_mine)
+            except Exception as e:
+                logger.error(f"Error in ROM pre-builder: {e}")
+            # A new challenge from the watcher starts its ROM build right away
+            rom_prebuild_wakeup.wait(5)
+            rom_prebuild_wakeup.clear()
+
+    if rom_coordinator.enabled:
+        prebuilder_thread = threading.Thread(target=rom_prebuilder, daemon=True)
+        prebuilder_thread.start()
+
+    challenge_watcher.start()
 
     # Start worker manager thread
     manager_thread = threading.Thread(target=worker_manager, daemon=True)
@@ -1102,22 +2634,27 @@ def main():
     logger.info(f"All {num_workers} workers started successfully")
 
     try:
-        display_dashboard(status_dict, num_workers, wallet_manager, challenge_tracker, initial_completed, night_balance_dict, api_base)
+        display_dashboard(status_board, num_workers, wallet_manager, challenge_tracker, initial_completed, night_balance_dict, api_base, rom_coordinator, submitter, stats_fetcher)
     except KeyboardInterrupt:
         print("\n\nStopping all miners...")
         logger.info("Received shutdown signal, stopping all workers...")
 
     # Signal shutdown
     shutdown_event.set()
+    challenge_watcher.stop()
 
-    # Terminate all workers
-    for worker_id, (process, wallet) in workers.items():
-        process.terminate()
+    # Terminate all workers (under the lock so the manager thread cannot respawn one meanwhile)
+    with worker_lock:
+        for worker_id, (process, wallet) in workers.items():
+            process.terminate()
 
     # Wait for workers to finish
     for worker_id, (process, wallet) in workers.items():
         process.join(timeout=5)
 
+    # Anything not yet submitted goes to solutions.csv for resubmit_solutions.py
+    submitter.stop()
+
     print("\n✓ All miners stopped")
     logger.info("All workers stopped")
 
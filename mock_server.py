@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the scavenger API, for offline and load testing
+
+Implements /challenge, /solution, /register, /statistics and /TandC with
+configurable latency, error rate and difficulty. Point the miner or the
+resubmitter at it with --api-base http://127.0.0.1:8000
+"""
+import argparse
+import json
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TERMS_MESSAGE = "I agree to abide by the terms and conditions as described in version 1-0 of the Midnight scavenger mining process: 281ba5f69f4b943e3fb8a20390878a232787a04e4be22177f2472b63df01c200"
+NIGHT_PER_SOLUTION = 1000000  # in the API's smallest unit (1 NIGHT)
+DEADLINE_FORMAT = '%Y-%m-%dT%H:%M:%S.000Z'
+
+
+class MockState:
+    """Challenges, registrations and accepted solutions, shared by all request threads"""
+
+    def __init__(self, difficulty, challenge_interval, deadline_hours, verify=False):
+        self.difficulty = difficulty
+        self.challenge_interval = challenge_interval
+        self.deadline = timedelta(hours=deadline_hours)
+        self.verify = verify
+        self.lock = threading.Lock()
+        self.challenges = {}
+        self.current = None
+        self.current_since = 0
+        self.registered = set()
+        self.solutions = {}  # (address, challenge_id) -> nonce
+        self.requests = {}
+        self.rom_lock = threading.Lock()  # one 1 GiB build at a time; guards roms
+        self.roms = {}
+        self.new_challenge()
+
+    def new_challenge(self):
+        number = len(self.challenges) + 1
+        challenge = {
+            "challenge_id": f"**D01C{number:02d}",
+            "day": 1,
+            "challenge_number": number,
+            "difficulty": self.difficulty,
+            "no_pre_mine": secrets.token_hex(32),
+            "no_pre_mine_hour": str(random.randint(100000000, 999999999)),
+            "latest_submission": (datetime.now(timezone.utc) + self.deadline).strftime(DEADLINE_FORMAT),
+        }
+        self.challenges[challenge["challenge_id"]] = challenge
+        self.current = challenge
+        self.current_since = time.time()
+        print(f"New challenge {challenge['challenge_id']} (difficulty {self.difficulty})")
+        return challenge
+
+    def current_challenge(self):
+        with self.lock:
+            if self.challenge_interval and time.time() - self.current_since >= self.challenge_interval:
+                self.new_challenge()
+            return self.current
+
+    def count(self, route):
+        with self.lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def challenge_rom(self, key):
+        """ROM for a challenge key, built once even when several solutions for it arrive together"""
+        import ashmaize_py
+
+        with self.rom_lock:
+            rom = self.roms.get(key)
+            if rom is None:
+                self.prune_roms()
+                rom = ashmaize_py.build_rom_twostep(key=key, size=1073741824, pre_size=16777216, mixing_numbers=4)
+                self.roms[key] = rom
+            return rom
+
+    def prune_roms(self):
+        """Drop ROMs no solution can need: keep the current challenge's and those before their deadline"""
+        now = datetime.now(timezone.utc)
+        with self.lock:
+            live = {self.current["no_pre_mine"]}
+            live.update(challenge["no_pre_mine"] for challenge in self.challenges.values()
+                        if datetime.strptime(challenge["latest_submission"], DEADLINE_FORMAT).replace(tzinfo=timezone.utc) > now)
+        for key in list(self.roms):
+            if key not in live:
+                del self.roms[key]
+
+    def check_solution(self, address, challenge, nonce):
+        """Recompute the hash like the real API would (only with --verify)"""
+        rom = self.challenge_rom(challenge["no_pre_mine"])
+
+        preimage = (nonce + address + challenge["challenge_id"] + challenge["difficulty"] +
+                    challenge["no_pre_mine"] + challenge["latest_submission"] + challenge["no_pre_mine_hour"])
+        prefix = int(rom.hash_batch([preimage])[0][:8], 16)
+        mask = int(challenge["difficulty"][:8], 16)
+        return (prefix | mask) == mask
+
+
+def make_handler(state, latency, jitter, error_rate):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, code, body, headers=None):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def simulate_network(self, route):
+            """Apply configured latency and failures; returns True if the request was failed"""
+            state.count(route)
+            delay = latency + random.uniform(-jitter, jitter)
+            if delay > 0:
+                time.sleep(delay)
+            if random.random() < error_rate:
+                self.send_json(503, {"message": "Service temporarily unavailable (mock)"})
+                return True
+            return False
+
+        def do_GET(self):
+            path = self.path.split('?')[0].rstrip('/')
+
+            if path.endswith('/challenge'):
+                if self.simulate_network('challenge'):
+                    return
+                challenge = state.current_challenge()
+                etag = f'"{challenge["challenge_id"]}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                return self.send_json(200, {"code": "active", "challenge": challenge}, {"ETag": etag})
+
+            match = re.search(r'/statistics/([^/]+)$', path)
+            if match:
+                if self.simulate_network('statistics'):
+                    return
+                address = match.group(1)
+                with state.lock:
+                    solved = sum(1 for (solver, _) in state.solutions if solver == address)
+                    total = len(state.solutions)
+                return self.send_json(200, {
+                    "local": {"crypto_receipts": solved, "night_allocation": solved * NIGHT_PER_SOLUTION},
+                    "global": {"challenges_solved": solved, "wallets": len(state.registered), "total_crypto_receipts": total},
+                })
+
+            if path.endswith('/TandC'):
+                if self.simulate_network('TandC'):
+                    return
+                return self.send_json(200, {"version": "1-0", "content": "Mock terms and conditions", "message": TERMS_MESSAGE})
+
+            self.send_json(404, {"message": "Not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            path = self.path.split('?')[0].rstrip('/')
+
+            match = re.search(r'/solution/([^/]+)/([^/]+)/([^/]+)$', path)
+            if match:
+                if self.simulate_network('solution'):
+                    return
+                address, challenge_id, nonce = match.groups()
+                with state.lock:
+                    challenge = state.challenges.get(challenge_id)
+                    exists = (address, challenge_id) in state.solutions
+                if challenge is None:
+                    return self.send_json(400, {"message": f"Unknown challenge {challenge_id}"})
+                if exists:
+                    return self.send_json(400, {"message": "Solution already exists"})
+                if state.verify and not state.check_solution(address, challenge, nonce):
+                    return self.send_json(400, {"message": "Solution does not meet difficulty"})
+                with state.lock:
+                    state.solutions[(address, challenge_id)] = nonce
+                return self.send_json(200, {"crypto_receipt": {
+                    "preimage": nonce + address + challenge_id,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "signature": secrets.token_hex(64),
+                }})
+
+            match = re.search(r'/register/([^/]+)/([^/]+)/([^/]+)$', path)
+            if match:
+                if self.simulate_network('register'):
+                    return
+                address = match.group(1)
+                with state.lock:
+                    if address in state.registered:
+                        return self.send_json(400, {"message": "Address already registered"})
+                    state.registered.add(address)
+                return self.send_json(201, {"registrationReceipt": {"timestamp": datetime.now(timezone.utc).isoformat()}})
+
+            self.send_json(404, {"message": "Not found"})
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock scavenger API for offline testing')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--difficulty', default='000FFFFF', help='Challenge difficulty mask, 8+ hex digits (default: 000FFFFF)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- seconds around --latency (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503 (default: 0)')
+    parser.add_argument('--challenge-interval', type=float, default=0, help='Seconds between new challenges, 0 for one challenge (default: 0)')
+    parser.add_argument('--deadline-hours', type=float, default=24, help='Hours each challenge accepts solutions (default: 24)')
+    parser.add_argument('--verify', action='store_true', help='Check submitted solutions against the real ROM (needs ashmaize_py and 1 GiB per challenge)')
+    args = parser.parse_args()
+
+    if not re.fullmatch(r'[0-9A-Fa-f]{8,}', args.difficulty):
+        print("Error: --difficulty must be at least 8 hex digits")
+        return 1
+    if not 0 <= args.error_rate <= 1:
+        print("Error: --error-rate must be between 0 and 1")
+        return 1
+
+    state = MockState(args.difficulty.upper(), args.challenge_interval, args.deadline_hours, verify=args.verify)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state, args.latency, args.jitter, args.error_rate))
+    server.daemon_threads = True
+
+    print(f"Mock scavenger API listening on http://{args.host}:{server.server_port}")
+    print(f"  latency {args.latency}s ±{args.jitter}s, error rate {args.error_rate:.0%}, verify {'on' if args.verify else 'off'}")
+    print("Press Ctrl+C to stop")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    print()
+    print("="*70)
+    print("REQUESTS:")
+    for route, count in sorted(state.requests.items()):
+        print(f"  {route:<12} {count}")
+    print(f"  Solutions accepted:  {len(state.solutions)}")
+    print(f"  Wallets registered:  {len(state.registered)}")
+    print("="*70)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
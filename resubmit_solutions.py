@@ -1,20 +1,77 @@
 #!/usr/bin/env python3
 """
 Standalone script to resubmit failed solutions from solutions.csv
+
+Solutions are submitted concurrently and every finished one is recorded in a
+checkpoint file, so an interrupted run picks up where it left off.
 """
+import argparse
 import requests
 import sys
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Same cross-platform file locking as miner.py, which appends to solutions.csv while this runs
+try:
+    import portalocker
+    HAS_PORTALOCKER = True
+except ImportError:
+    HAS_PORTALOCKER = False
+    if os.name == 'nt':
+        import msvcrt
+    else:
+        import fcntl
 
 API_BASE = "https://scavenger.prod.gd.midnighttge.io"
 SOLUTIONS_FILE = "solutions.csv"
+CHECKPOINT_FILE = "solutions.csv.done"
+DEFAULT_WORKERS = 16
+PROGRESS_INTERVAL = 5  # seconds between progress lines
+
+_local = threading.local()
+
+
+def lock_file(file_handle):
+    """Acquire exclusive lock on file (cross-platform)"""
+    if HAS_PORTALOCKER:
+        portalocker.lock(file_handle, portalocker.LOCK_EX)
+    elif os.name == 'nt':
+        msvcrt.locking(file_handle.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(file_handle.fileno(), fcntl.LOCK_EX)
+
 
-def submit_solution(address, challenge_id, nonce):
+def unlock_file(file_handle):
+    """Release lock on file (cross-platform)"""
+    if HAS_PORTALOCKER:
+        portalocker.unlock(file_handle)
+    elif os.name == 'nt':
+        file_handle.seek(0)
+        msvcrt.locking(file_handle.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file_handle.fileno(), fcntl.LOCK_UN)
+
+
+def get_session(pool_size):
+    """One keep-alive session per submitting thread"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _local.session = session
+    return session
+
+
+def submit_solution(address, challenge_id, nonce, session=None, api_base=API_BASE):
     """Submit a solution to the API"""
-    url = f"{API_BASE}/solution/{address}/{challenge_id}/{nonce}"
+    url = f"{api_base.rstrip('/')}/solution/{address}/{challenge_id}/{nonce}"
 
     try:
-        response = requests.post(url, json={}, timeout=15)
+        response = (session or requests).post(url, json={}, timeout=15)
         response.raise_for_status()
         data = response.json()
 
@@ -37,68 +94,151 @@ def submit_solution(address, challenge_id, nonce):
         return ("error", str(e))
 
 
+def load_checkpoint():
+    """Lines already accepted (or already on the server) in an earlier, interrupted run"""
+    if not os.path.exists(CHECKPOINT_FILE):
+        return set()
+    with open(CHECKPOINT_FILE, 'r') as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def read_solutions(skip):
+    """Stream unique, not yet completed lines from the solutions file"""
+    seen = set(skip)
+    with open(SOLUTIONS_FILE, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line in seen:
+                continue
+            seen.add(line)
+            yield line
+
+
+def rewrite_solutions(completed):
+    """Drop completed lines from the solutions file, keeping anything appended meanwhile.
+
+    The file is rewritten in place under the miner's lock rather than replaced, so
+    an append waiting on the lock lands in the rewritten file, not an orphaned one.
+    Kept lines only move towards the start, so a crash part way through can garble
+    at most one line and never loses one.
+    """
+    with open(SOLUTIONS_FILE, 'r+') as f:
+        lock_file(f)
+        try:
+            kept = []
+            seen = set()
+            for line in f:
+                line = line.strip()
+                if line and line not in completed and line not in seen:
+                    seen.add(line)
+                    kept.append(line)
+
+            f.seek(0)
+            f.write("".join(line + '\n' for line in kept))
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            unlock_file(f)
+    return len(kept)
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Resubmit failed solutions from solutions.csv')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'Concurrent submissions (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--api-base', default=API_BASE, help=f'API to submit to, e.g. a local mock_server.py (default: {API_BASE})')
+    args = parser.parse_args()
+
     if not os.path.exists(SOLUTIONS_FILE):
         print(f"Error: {SOLUTIONS_FILE} not found")
         return 1
 
-    # Read all solutions
+    completed = load_checkpoint()
+    if completed:
+        print(f"Resuming: {len(completed)} solution(s) already submitted in a previous run")
+
     with open(SOLUTIONS_FILE, 'r') as f:
-        lines = f.readlines()
+        total_lines = sum(1 for line in f if line.strip())
 
-    if not lines:
+    if not total_lines:
         print(f"{SOLUTIONS_FILE} is empty")
         return 0
 
-    print(f"Found {len(lines)} solution(s) to resubmit")
+    print(f"Found {total_lines} line(s) in {SOLUTIONS_FILE}, submitting with {args.workers} workers")
     print("="*70)
 
     results = {
         "success": 0,
         "already_exists": 0,
         "rejected": 0,
-        "error": 0
+        "error": 0,
+        "invalid": 0
     }
 
-    failed_solutions = []
+    start_time = time.time()
+    last_progress = start_time
+    processed = 0
+
+    def submit_line(line):
+        address, challenge_id, nonce = line.split(',')
+        return submit_solution(address, challenge_id, nonce, session=get_session(args.workers), api_base=args.api_base)
 
-    for i, line in enumerate(lines, 1):
-        line = line.strip()
-        if not line:
-            continue
+    checkpoint = open(CHECKPOINT_FILE, 'a')
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        in_flight = {}
+
+        def collect(done):
+            nonlocal processed
+            for future in done:
+                line = in_flight.pop(future)
+                status, message = future.result()
+                results[status] += 1
+                processed += 1
+
+                if status in ("success", "already_exists"):
+                    # Checkpoint immediately so a crash never resubmits this line
+                    completed.add(line)
+                    checkpoint.write(line + '\n')
+                    checkpoint.flush()
+                else:
+                    label = "REJECTED" if status == "rejected" else "ERROR"
+                    address, challenge_id, _ = line.split(',')
+                    print(f"✗ {label}: {address[:20]}... / {challenge_id[:20]}... - {message}")
 
         try:
-            parts = line.split(',')
-            if len(parts) != 3:
-                print(f"[{i}] SKIP: Invalid format: {line}")
-                failed_solutions.append(line)
-                continue
+            for line in read_solutions(completed):
+                if len(line.split(',')) != 3:
+                    print(f"SKIP: Invalid format: {line}")
+                    results["invalid"] += 1
+                    continue
 
-            address, challenge_id, nonce = parts
+                # Keep the queue bounded so huge files are streamed, not loaded
+                if len(in_flight) >= args.workers * 4:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done)
 
-            print(f"[{i}/{len(lines)}] Submitting: {address[:20]}... / {challenge_id[:20]}...", end=" ")
+                in_flight[executor.submit(submit_line, line)] = line
 
-            status, message = submit_solution(address, challenge_id, nonce)
+                now = time.time()
+                if now - last_progress >= PROGRESS_INTERVAL:
+                    last_progress = now
+                    print(f"[{processed}/{total_lines}] {processed / (now - start_time):.1f} solutions/s")
 
-            if status == "success":
-                print(f"✓ SUCCESS")
-                results["success"] += 1
-            elif status == "already_exists":
-                print(f"✓ ALREADY EXISTS")
-                results["already_exists"] += 1
-            elif status == "rejected":
-                print(f"✗ REJECTED: {message}")
-                results["rejected"] += 1
-                failed_solutions.append(line)
-            else:
-                print(f"✗ ERROR: {message}")
-                results["error"] += 1
-                failed_solutions.append(line)
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+        except KeyboardInterrupt:
+            # Drop queued lines, but checkpoint the ones already sent so they are not resubmitted
+            print("\nInterrupted - waiting for submissions already in progress...")
+            executor.shutdown(cancel_futures=True)
+            collect([future for future in list(in_flight) if not future.cancelled()])
+            checkpoint.close()
+            print("Progress saved, run again to continue")
+            return 1
+    checkpoint.close()
 
-        except Exception as e:
-            print(f"[{i}] ERROR: {e}")
-            failed_solutions.append(line)
-            results["error"] += 1
+    elapsed = time.time() - start_time
+    duplicates = total_lines - processed - results["invalid"]
 
     print()
     print("="*70)
@@ -107,16 +247,18 @@ def main():
     print(f"  Already existed:         {results['already_exists']}")
     print(f"  Rejected:                {results['rejected']}")
     print(f"  Errors:                  {results['error']}")
-    print(f"  Total:                   {len(lines)}")
+    print(f"  Invalid lines:           {results['invalid']}")
+    print(f"  Duplicates/resumed:      {duplicates}")
+    print(f"  Total:                   {total_lines}")
+    print(f"  Throughput:              {processed / elapsed if elapsed > 0 else 0:.1f} solutions/s ({elapsed:.1f}s)")
     print("="*70)
 
-    # Automatically rewrite solutions.csv with only failed submissions
-    if failed_solutions:
-        with open(SOLUTIONS_FILE, 'w') as f:
-            for solution in failed_solutions:
-                f.write(solution + '\n')
-        print(f"\n✓ Updated {SOLUTIONS_FILE} - kept {len(failed_solutions)} failed solution(s)")
-        print(f"  Removed {results['success'] + results['already_exists']} successful/existing solution(s)")
+    # Rewrite solutions.csv with only failed submissions, then the checkpoint is no longer needed
+    remaining = rewrite_solutions(completed)
+    os.remove(CHECKPOINT_FILE)
+    if remaining:
+        print(f"\n✓ Updated {SOLUTIONS_FILE} - kept {remaining} failed solution(s)")
+        print(f"  Removed {len(completed)} successful/existing solution(s)")
     else:
         print(f"\n✓ All solutions submitted successfully - wiped {SOLUTIONS_FILE}")
 